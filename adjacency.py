@@ -0,0 +1,210 @@
+import hashlib
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import sparse
+
+
+def build_adjacency(gdf, kind="queen", batch_size=100_000):
+    """
+    Build a contiguity graph of tracts as a symmetric sparse matrix.
+
+    Candidate neighbours come from one bulk STRtree query. Queen contiguity
+    keeps every pair that touches; rook contiguity additionally requires a
+    shared boundary of positive length, checked in vectorized batches.
+
+    Args:
+        gdf (gpd.GeoDataFrame): Tract geometries
+        kind (str): "queen" or "rook"
+        batch_size (int): Number of candidate pairs checked per batch
+
+    Returns:
+        sparse.csr_matrix: Binary (n, n) adjacency matrix aligned to gdf rows
+    """
+    if kind not in ("queen", "rook"):
+        raise ValueError(f"Unknown contiguity kind: {kind}")
+
+    geoms = np.asarray(gdf.geometry.values)
+    left, right = gdf.sindex.query(geoms, predicate="intersects")
+    # Each pair is found from both sides; keep one copy and drop self-pairs
+    keep = left < right
+    left, right = left[keep], right[keep]
+
+    if kind == "rook":
+        boundaries = shapely.boundary(geoms)
+        shared = np.empty(len(left), dtype=bool)
+        for start in range(0, len(left), batch_size):
+            batch = slice(start, start + batch_size)
+            shared[batch] = shares_edge(
+                boundaries[left[batch]], boundaries[right[batch]]
+            )
+        left, right = left[shared], right[shared]
+
+    return pairs_to_adjacency(left, right, len(gdf))
+
+
+def shares_edge(boundaries_a, boundaries_b):
+    """Whether each pair of boundaries overlaps along a positive length."""
+    return shapely.length(shapely.intersection(boundaries_a, boundaries_b)) > 0
+
+
+def pairs_to_adjacency(left, right, n):
+    """Symmetric binary (n, n) csr matrix from one copy of each pair."""
+    ones = np.ones(len(left), dtype="float64")
+    upper = sparse.coo_matrix((ones, (left, right)), shape=(n, n))
+    return (upper + upper.T).tocsr()
+
+
+def _geometry_fingerprint(gdf):
+    """Hash the GEOIDs and geometries an adjacency matrix depends on."""
+    digest = hashlib.sha1()
+    digest.update("\n".join(gdf["GEOID"].astype(str)).encode())
+    for wkb in shapely.to_wkb(np.asarray(gdf.geometry.values)):
+        digest.update(wkb)
+    return digest.hexdigest()
+
+
+def load_adjacency(json_file, kind="queen"):
+    """
+    Return the adjacency graph for a tract GeoJSON, cached next to it.
+
+    The matrix is stored as <json_file>.<kind>.npz and rebuilt when the
+    GEOIDs or geometries in the GeoJSON change.
+
+    Args:
+        json_file (str): Combined or simplified tract GeoJSON
+        kind (str): "queen" or "rook"
+
+    Returns:
+        tuple: (csr adjacency matrix, pd.Index of GEOIDs aligned to it)
+    """
+    gdf = gpd.read_file(json_file, columns=["GEOID"])
+    geoids = pd.Index(gdf["GEOID"].astype(str), name="GEOID")
+    fingerprint = _geometry_fingerprint(gdf)
+    cache_path = f"{json_file}.{kind}.npz"
+
+    if os.path.exists(cache_path):
+        matrix, _, cached_fingerprint = read_adjacency(cache_path)
+        if cached_fingerprint == fingerprint:
+            return matrix, geoids
+
+    matrix = build_adjacency(gdf, kind)
+    save_adjacency(cache_path, matrix, geoids, fingerprint)
+    print(f"Adjacency graph cached to {cache_path}")
+    return matrix, geoids
+
+
+def save_adjacency(path, matrix, geoids, fingerprint=""):
+    """Save an adjacency matrix and its GEOIDs as a compressed .npz file."""
+    np.savez_compressed(
+        path,
+        fingerprint=np.array(fingerprint),
+        geoids=np.asarray(geoids, dtype=str),
+        shape=np.array(matrix.shape),
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+    )
+
+
+def read_adjacency(path):
+    """
+    Read a file written by save_adjacency.
+
+    Returns:
+        tuple: (csr matrix, pd.Index of GEOIDs, fingerprint string)
+    """
+    with np.load(path) as saved:
+        matrix = sparse.csr_matrix(
+            (saved["data"], saved["indices"], saved["indptr"]),
+            shape=tuple(saved["shape"]),
+        )
+        # Caches written before GEOIDs were stored have none
+        stored = saved["geoids"] if "geoids" in saved.files else np.empty(0)
+        geoids = pd.Index(stored.astype(str), name="GEOID")
+        return matrix, geoids, str(saved["fingerprint"])
+
+
+def spatial_lag(adjacency, values):
+    """
+    Average of each tract's neighbours, ignoring missing values.
+
+    Returns NaN for tracts with no observed neighbours.
+    """
+    values = np.asarray(values, dtype="float64")
+    observed = np.isfinite(values)
+    total = adjacency @ np.where(observed, values, 0.0)
+    count = adjacency @ observed.astype("float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def smooth(adjacency, values):
+    """Spatially smooth values as the mean of each tract and its neighbours."""
+    n = adjacency.shape[0]
+    return spatial_lag(adjacency + sparse.identity(n, format="csr"), values)
+
+
+def local_morans_i(adjacency, values):
+    """
+    Local Moran's I with row-standardized weights.
+
+    Returns:
+        tuple: (local I per tract, quadrant label per tract: "HH", "LL",
+        "HL", "LH", or "" where the value or its lag is missing)
+    """
+    values = np.asarray(values, dtype="float64")
+    z = (values - np.nanmean(values)) / np.nanstd(values)
+    lag = spatial_lag(adjacency, z)
+    local_i = z * lag
+
+    quadrant = np.full(len(values), "", dtype=object)
+    valid = np.isfinite(z) & np.isfinite(lag)
+    high, high_lag = z > 0, lag > 0
+    quadrant[valid & high & high_lag] = "HH"
+    quadrant[valid & ~high & ~high_lag] = "LL"
+    quadrant[valid & high & ~high_lag] = "HL"
+    quadrant[valid & ~high & high_lag] = "LH"
+    return local_i, quadrant
+
+
+def neighborhood_stats(csv_file, json_file, column, kind="queen", adjacency=None):
+    """
+    Compute spatial lag, smoothing and local Moran's I for a column.
+
+    Args:
+        csv_file (str): Processed CSV with a GEOID column
+        json_file (str): Tract GeoJSON the adjacency graph is built from
+        column (str): Numeric column to analyse
+        kind (str): "queen" or "rook"
+        adjacency (tuple): Optional prebuilt (matrix, GEOIDs), e.g. from
+            read_adjacency; json_file is then not read
+
+    Returns:
+        pd.DataFrame: One row per tract in the geometry
+    """
+    df = pd.read_csv(csv_file, dtype={"GEOID": str})
+    if adjacency is None:
+        adjacency, geoids = load_adjacency(json_file, kind)
+    else:
+        adjacency, geoids = adjacency[0], pd.Index(adjacency[1], name="GEOID")
+    values = (
+        pd.to_numeric(df.set_index("GEOID")[column], errors="coerce")
+        .reindex(geoids)
+        .to_numpy()
+    )
+
+    local_i, quadrant = local_morans_i(adjacency, values)
+    return pd.DataFrame(
+        {
+            "GEOID": geoids,
+            column: values,
+            f"{column}_lag": spatial_lag(adjacency, values),
+            f"{column}_smoothed": smooth(adjacency, values),
+            f"{column}_local_i": local_i,
+            f"{column}_quadrant": quadrant,
+        }
+    )
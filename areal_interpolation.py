@@ -0,0 +1,173 @@
+import hashlib
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import sparse
+
+from crosswalk import Crosswalk, reallocate_columns
+
+
+def _layer_fingerprint(tracts, targets, target_id):
+    """Hash the inputs a cached weight matrix depends on."""
+    digest = hashlib.sha1()
+    for layer, ids in [(tracts, "GEOID"), (targets, target_id)]:
+        digest.update("\n".join(layer[ids].astype(str)).encode())
+        for wkb in shapely.to_wkb(np.asarray(layer.geometry.values)):
+            digest.update(wkb)
+    return digest.hexdigest()
+
+
+def build_areal_weights(tracts, targets, target_id, batch_size=100_000):
+    """
+    Build areal-interpolation weights from tracts to arbitrary target zones.
+
+    Candidate pairs come from one bulk STRtree query; intersection areas are
+    then computed with vectorized shapely calls in batches of pairs so memory
+    stays bounded at national scale.
+
+    Args:
+        tracts (gpd.GeoDataFrame): Combined tracts with a GEOID column
+        targets (gpd.GeoDataFrame): Target zones (service areas, grids, ...)
+        target_id (str): Column in targets identifying each zone
+        batch_size (int): Number of tract/zone pairs intersected per batch
+
+    Returns:
+        Crosswalk: Weights of shape (n_targets, n_tracts), usable with
+        crosswalk.reallocate_columns
+    """
+    if targets.crs is not None and tracts.crs is not None:
+        targets = targets.to_crs(tracts.crs)
+
+    tract_geoms = np.asarray(tracts.geometry.values)
+    target_geoms = np.asarray(targets.geometry.values)
+    target_idx, tract_idx = tracts.sindex.query(target_geoms, predicate="intersects")
+
+    part_area = np.empty(len(target_idx), dtype="float64")
+    for start in range(0, len(target_idx), batch_size):
+        batch = slice(start, start + batch_size)
+        part_area[batch] = shapely.area(
+            shapely.intersection(
+                target_geoms[target_idx[batch]], tract_geoms[tract_idx[batch]]
+            )
+        )
+
+    # Pairs that only touch along an edge carry no area
+    keep = part_area > 0
+    target_idx, tract_idx = target_idx[keep], tract_idx[keep]
+    part_area = part_area[keep]
+
+    tract_area = shapely.area(tract_geoms)
+    weights = part_area / tract_area[tract_idx]
+
+    shape = (len(targets), len(tracts))
+    return Crosswalk(
+        sparse.csr_matrix((weights, (target_idx, tract_idx)), shape=shape),
+        sparse.csr_matrix((part_area, (target_idx, tract_idx)), shape=shape),
+        pd.Index(tracts["GEOID"].astype(str), name="GEOID"),
+        pd.Index(targets[target_id].astype(str), name=target_id),
+    )
+
+
+def _save_weights(path, weights, fingerprint):
+    """Write a Crosswalk and its fingerprint to a single .npz file."""
+    matrix, part_area = weights.matrix.tocsr(), weights.part_area.tocsr()
+    np.savez_compressed(
+        path,
+        fingerprint=np.array(fingerprint),
+        shape=np.array(matrix.shape),
+        indptr=matrix.indptr,
+        indices=matrix.indices,
+        weights=matrix.data,
+        part_area=part_area.data,
+        source_geoids=weights.source_geoids.to_numpy(dtype=str),
+        target_geoids=weights.target_geoids.to_numpy(dtype=str),
+        target_name=np.array(weights.target_geoids.name),
+    )
+
+
+def _load_weights(path, fingerprint):
+    """Read cached weights, or return None if missing or stale."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as cached:
+        if str(cached["fingerprint"]) != fingerprint:
+            return None
+        shape = tuple(cached["shape"])
+        structure = (cached["indices"], cached["indptr"])
+        return Crosswalk(
+            sparse.csr_matrix((cached["weights"], *structure), shape=shape),
+            sparse.csr_matrix((cached["part_area"], *structure), shape=shape),
+            pd.Index(cached["source_geoids"], name="GEOID"),
+            pd.Index(cached["target_geoids"], name=str(cached["target_name"])),
+        )
+
+
+def load_areal_weights(tracts, targets, target_id, cache_path, batch_size=100_000):
+    """
+    Return areal weights for a target layer, building them only once.
+
+    Weights are cached in cache_path and rebuilt automatically when the tract
+    GEOIDs or target geometries change.
+
+    Args:
+        tracts (gpd.GeoDataFrame): Combined tracts with a GEOID column
+        targets (gpd.GeoDataFrame): Target zones
+        target_id (str): Column in targets identifying each zone
+        cache_path (str): .npz file holding the cached weights
+        batch_size (int): Number of tract/zone pairs intersected per batch
+
+    Returns:
+        Crosswalk: Weights of shape (n_targets, n_tracts)
+    """
+    fingerprint = _layer_fingerprint(tracts, targets, target_id)
+    weights = _load_weights(cache_path, fingerprint)
+    if weights is None:
+        weights = build_areal_weights(tracts, targets, target_id, batch_size)
+        _save_weights(cache_path, weights, fingerprint)
+        print(f"Areal weights cached to {cache_path}")
+    return weights
+
+
+def interpolate_csv(
+    csv_file,
+    tracts_path,
+    targets_path,
+    target_id,
+    output_file,
+    columns,
+    cache_path=None,
+    intensive=False,
+):
+    """
+    Interpolate processed tract columns onto a target geography.
+
+    Args:
+        csv_file (str): Processed CSV with a GEOID column
+        tracts_path (str): Combined tract GeoJSON from convert_to_geojson
+        targets_path (str): Any file geopandas can read with the target zones
+        target_id (str): Column in the targets identifying each zone
+        output_file (str): Path to save the interpolated CSV
+        columns (list): Numeric columns to interpolate
+        cache_path (str): Optional .npz cache for the target layer weights
+        intensive (bool): Treat columns as rates rather than counts
+
+    Returns:
+        pd.DataFrame: One row per target zone
+    """
+    df = pd.read_csv(csv_file, dtype={"GEOID": str})
+    tracts = gpd.read_file(tracts_path, columns=["GEOID"])
+    targets = gpd.read_file(targets_path)
+
+    if cache_path:
+        weights = load_areal_weights(tracts, targets, target_id, cache_path)
+    else:
+        weights = build_areal_weights(tracts, targets, target_id)
+
+    out = reallocate_columns(df, weights, columns, intensive=intensive)
+    out = out.rename(columns={"GEOID": target_id})
+    out.to_csv(output_file, index=False)
+    print(f"Interpolated {len(df)} tracts onto {len(out)} zones in {output_file}")
+    return out
@@ -0,0 +1,162 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Census tract relationship files (e.g. tab20_tract20_tract10_natl.txt) are
+# pipe-delimited with one row per intersection of a 2020 and a 2010 tract.
+RELATIONSHIP_COLUMNS = [
+    "GEOID_TRACT_20",
+    "GEOID_TRACT_10",
+    "AREALAND_TRACT_20",
+    "AREALAND_TRACT_10",
+    "AREAWATER_TRACT_20",
+    "AREAWATER_TRACT_10",
+    "AREALAND_PART",
+    "AREAWATER_PART",
+]
+
+Crosswalk = namedtuple(
+    "Crosswalk", ["matrix", "part_area", "source_geoids", "target_geoids"]
+)
+
+
+def read_tract_relationship(path, sep="|"):
+    """
+    Read a local copy of the Census tract relationship file.
+
+    Args:
+        path (str): Path to the relationship file
+        sep (str): Field delimiter used by the file
+
+    Returns:
+        pd.DataFrame: GEOIDs as strings and area columns as int64
+    """
+    df = pd.read_csv(
+        path,
+        sep=sep,
+        dtype=str,
+        usecols=RELATIONSHIP_COLUMNS,
+        encoding="utf-8-sig",
+    )
+    area_cols = [col for col in RELATIONSHIP_COLUMNS if col.startswith("AREA")]
+    df[area_cols] = df[area_cols].apply(pd.to_numeric).fillna(0).astype("int64")
+    return df
+
+
+def build_crosswalk(relationship, source="10", target="20"):
+    """
+    Build a sparse reallocation matrix from a tract relationship table.
+
+    Each source tract's value is split across the target tracts it overlaps
+    in proportion to the share of its land area falling in each part. Water-
+    only source tracts fall back to water area so they are not dropped.
+
+    Args:
+        relationship (pd.DataFrame): Output of read_tract_relationship
+        source (str): Source vintage suffix, "10" or "20"
+        target (str): Target vintage suffix, "10" or "20"
+
+    Returns:
+        Crosswalk: CSR weight and part-area matrices of shape
+        (n_target, n_source) with the sorted source and target GEOID indexes
+        they are aligned to
+    """
+    if {source, target} != {"10", "20"}:
+        raise ValueError("source and target must be '10' and '20'")
+
+    rel = relationship.dropna(subset=[f"GEOID_TRACT_{source}", f"GEOID_TRACT_{target}"])
+    source_codes, source_geoids = pd.factorize(rel[f"GEOID_TRACT_{source}"], sort=True)
+    target_codes, target_geoids = pd.factorize(rel[f"GEOID_TRACT_{target}"], sort=True)
+
+    land_part = rel["AREALAND_PART"].to_numpy(dtype="float64")
+    land_total = rel[f"AREALAND_TRACT_{source}"].to_numpy(dtype="float64")
+    water_part = rel["AREAWATER_PART"].to_numpy(dtype="float64")
+    water_total = rel[f"AREAWATER_TRACT_{source}"].to_numpy(dtype="float64")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(
+            land_total > 0,
+            land_part / land_total,
+            np.where(water_total > 0, water_part / water_total, 0.0),
+        )
+
+    shape = (len(target_geoids), len(source_geoids))
+    matrix = sparse.csr_matrix((weights, (target_codes, source_codes)), shape=shape)
+    part_area = sparse.csr_matrix(
+        (land_part + water_part, (target_codes, source_codes)), shape=shape
+    )
+    return Crosswalk(
+        matrix,
+        part_area,
+        pd.Index(source_geoids, name="GEOID"),
+        pd.Index(target_geoids, name="GEOID"),
+    )
+
+
+def reallocate_columns(df, crosswalk, columns, intensive=False, geoid_col="GEOID"):
+    """
+    Remap tract-level columns between vintages with one sparse product.
+
+    Count columns (extensive) are split by area share. Rates and other
+    intensive columns are area-weighted averages of the source tracts.
+
+    Args:
+        df (pd.DataFrame): Source-vintage table with a GEOID column
+        crosswalk (Crosswalk): Output of build_crosswalk
+        columns (list): Numeric columns to reallocate
+        intensive (bool): Treat columns as rates rather than counts
+        geoid_col (str): Name of the GEOID column in df
+
+    Returns:
+        pd.DataFrame: Target-vintage table with GEOID + the given columns
+    """
+    values = (
+        df.set_index(df[geoid_col].astype(str))[columns]
+        .apply(pd.to_numeric, errors="coerce")
+        .reindex(crosswalk.source_geoids)
+    )
+    present = values.notna().to_numpy(dtype="float64")
+    data = values.fillna(0).to_numpy(dtype="float64")
+
+    if intensive:
+        # Weight by intersection area and normalize by the area actually
+        # observed so missing source tracts do not drag averages to zero.
+        total = crosswalk.part_area @ data
+        covered = crosswalk.part_area @ present
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = np.where(covered > 0, total / covered, np.nan)
+    else:
+        result = crosswalk.matrix @ data
+
+    out = pd.DataFrame(result, columns=columns)
+    out.insert(0, geoid_col, crosswalk.target_geoids.to_numpy())
+    return out
+
+
+def reallocate_csv(
+    input_file, output_file, relationship_path, columns, source="10", target="20"
+):
+    """
+    Reallocate a processed tract CSV from one tract vintage to another.
+
+    Args:
+        input_file (str): Processed CSV with a GEOID column
+        output_file (str): Path to save the reallocated CSV
+        relationship_path (str): Local copy of the tract relationship file
+        columns (list): Count columns to reallocate
+        source (str): Vintage of the input GEOIDs
+        target (str): Vintage to reallocate to
+
+    Returns:
+        pd.DataFrame: The reallocated table
+    """
+    df = pd.read_csv(input_file, dtype={"GEOID": str})
+    crosswalk = build_crosswalk(
+        read_tract_relationship(relationship_path), source=source, target=target
+    )
+    out = reallocate_columns(df, crosswalk, columns)
+    out.to_csv(output_file, index=False)
+    print(f"Reallocated {len(df)} tracts to {len(out)} tracts in {output_file}")
+    return out
@@ -1,6 +1,12 @@
 import pandas as pd
 import numpy as np
 
+from validation import SENTINEL_NUMBERS
+
+# Fixed-point float format for every CSV artifact, so identical inputs give
+# byte-identical files (and manifest hashes) whatever the pandas version
+FLOAT_FORMAT = "%.6f"
+
 # ── MONKEY‐PATCH pandas.read_csv ───────────────────────────────────────────────
 _original_read_csv = pd.read_csv
 
@@ -22,18 +28,30 @@ pd.read_csv = _read_csv_wrapper
 
 
 def process_csv(input_file, output_file, columns_to_keep):
-    # Read everything as strings
-    df = pd.read_csv(input_file, dtype=str)
-
-    # Drop the first (header) row that was carried in as data
-    if len(df) > 0:
-        df = df.iloc[1:].copy()
+    """
+    Keep selected columns of an ACS CSV, dropping its description row.
+
+    Only the requested columns are parsed, all as strings so GEOIDs keep
+    their leading zeros, and the description row under the header is
+    skipped while reading rather than copied and dropped afterwards.
+
+    Args:
+        input_file (str): Path to input CSV file
+        output_file (str): Path to save the processed CSV file
+        columns_to_keep (list): List of column names to keep
+    """
+    # Fail like a DataFrame column lookup when a column is missing
+    header = pd.read_csv(input_file, dtype=str, nrows=0).columns
+    missing = [col for col in columns_to_keep if col not in header]
+    if missing:
+        raise KeyError(f"Columns not found in {input_file}: {missing}")
 
-    # Subset to exactly the requested columns
+    df = pd.read_csv(input_file, dtype=str, usecols=columns_to_keep, skiprows=[1])
     df = df[columns_to_keep]
 
     # Write with string values preserved
-    df.to_csv(output_file, index=False, quoting=1)  # Force quoting to preserve strings
+    # Force quoting to preserve strings
+    df.to_csv(output_file, index=False, quoting=1, float_format=FLOAT_FORMAT)
     print(f"Processed CSV saved to {output_file}")
 
 
@@ -46,11 +64,11 @@ def convert_and_save_csv(
     df["Total_Population"] = pd.to_numeric(df["Total_Population"], errors="coerce")
     df["Total_Population"].fillna(0, inplace=True)
     df["GEOID"] = df["GEOID"].str[9:]
-    df.to_csv(output_csv_file, index=False)
+    df.to_csv(output_csv_file, index=False, float_format=FLOAT_FORMAT)
     return df.dtypes, df.isnull().sum()
 
 
-def process_acs_csv(input_file, output_file, column_mapping):
+def process_acs_csv(input_file, output_file, column_mapping, tract_geoids=False):
     # Read everything in as strings so we don't lose leading zeros
     df = pd.read_csv(input_file, dtype=str)
 
@@ -59,8 +77,14 @@ def process_acs_csv(input_file, output_file, column_mapping):
     if missing:
         raise KeyError(f"Missing columns in ACS data: {missing}")
 
-    # Extract the 5‐digit tract ID as a string
-    df["GEOID"] = df["GEO_ID"].astype(str).str[-5:]
+    if tract_geoids:
+        # Keep tract rows only (drops the description row) and the full
+        # 11-digit GEOID after the "1400000US" prefix, as in TIGER
+        df = df[df["GEO_ID"].str.startswith("1400000US", na=False)].copy()
+        df["GEOID"] = df["GEO_ID"].str[9:]
+    else:
+        # Extract the 5‐digit tract ID as a string
+        df["GEOID"] = df["GEO_ID"].astype(str).str[-5:]
 
     # Rename the ACS columns
     df = df.rename(columns=column_mapping)
@@ -69,14 +93,18 @@ def process_acs_csv(input_file, output_file, column_mapping):
     cols = ["GEOID"] + list(column_mapping.values())
     out = df[cols].copy()  # Create a copy to avoid SettingWithCopyWarning
 
-    # Convert population columns to float64
-    for col in out.columns:
-        if col != "GEOID" and "Population" in col:
-            out[col] = (
-                pd.to_numeric(out[col], errors="coerce").fillna(0).astype("float64")
-            )
-
-    out.to_csv(output_file, index=False)
+    # Convert population columns to float64, and blank ACS sentinels
+    # (-666666666, ...) so the map shows no data rather than a value
+    for col in out.columns.drop("GEOID"):
+        values = pd.to_numeric(out[col], errors="coerce")
+        sentinel = values.isin(SENTINEL_NUMBERS)
+        if "Population" in col:
+            out[col] = values.fillna(0).astype("float64")
+        out.loc[sentinel, col] = np.nan
+
+    # Sort by GEOID so the output does not depend on the input row order
+    out = out.sort_values("GEOID", kind="stable")
+    out.to_csv(output_file, index=False, float_format=FLOAT_FORMAT)
 
     # Return dtype + null‐counts
     dtypes = out.dtypes.astype(str).to_dict()
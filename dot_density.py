@@ -0,0 +1,207 @@
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+# One record per dot: little-endian float32 lon/lat plus a category byte,
+# 9 bytes per point, ready to upload as a WebGL vertex buffer.
+POINT_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("category", "u1")])
+
+
+def sample_points(geometries, counts, rng, max_rounds=50):
+    """
+    Sample counts[i] uniform random points inside geometries[i].
+
+    Candidates are drawn in each geometry's bounding box for all tracts at
+    once and tested with a single vectorized contains_xy call against
+    prepared geometries. Tracts still short of their count are resampled in
+    later rounds. Geometries still short after max_rounds (zero-area,
+    sliver or null geometries) are reported with a warning.
+
+    Args:
+        geometries (array-like): Polygon geometries
+        counts (array-like): Number of points wanted per geometry
+        rng (np.random.Generator): Random number source
+        max_rounds (int): Maximum rejection rounds
+
+    Returns:
+        tuple: (x, y, owner) arrays; owner is the index into geometries
+    """
+    geometries = np.asarray(geometries)
+    counts = np.asarray(counts, dtype="int64")
+    shapely.prepare(geometries)
+
+    bounds = shapely.bounds(geometries)
+    width, height = bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fill = np.nan_to_num(shapely.area(geometries) / (width * height), nan=1.0)
+    fill = np.clip(fill, 0.05, 1.0)
+
+    xs, ys, owners = [], [], []
+    remaining = counts.copy()
+    for _ in range(max_rounds):
+        wanted = np.flatnonzero(remaining > 0)
+        if not len(wanted):
+            break
+        # Oversample by the expected rejection rate of each bounding box
+        draws = np.ceil(remaining[wanted] / fill[wanted] * 1.2).astype("int64") + 1
+        idx = np.repeat(wanted, draws)
+        x = bounds[idx, 0] + rng.random(len(idx)) * width[idx]
+        y = bounds[idx, 1] + rng.random(len(idx)) * height[idx]
+        inside = shapely.contains_xy(geometries[idx], x, y)
+        idx, x, y = idx[inside], x[inside], y[inside]
+
+        # Keep at most remaining[i] hits per geometry; idx is already grouped
+        starts = np.searchsorted(idx, idx, side="left")
+        rank = np.arange(len(idx)) - starts
+        keep = rank < remaining[idx]
+        xs.append(x[keep])
+        ys.append(y[keep])
+        owners.append(idx[keep])
+        remaining -= np.bincount(idx[keep], minlength=len(remaining))
+
+    short = np.flatnonzero(remaining > 0)
+    if len(short):
+        warnings.warn(
+            f"{remaining[short].sum()} points not placed after {max_rounds} "
+            f"rounds; short geometries (index: missing): "
+            f"{dict(zip(short.tolist(), remaining[short].tolist()))}"
+        )
+
+    if not xs:
+        empty = np.empty(0)
+        return empty, empty, np.empty(0, dtype="int64")
+    return np.concatenate(xs), np.concatenate(ys), np.concatenate(owners)
+
+
+def _sample_partition(wkb, counts, categories, seed):
+    """
+    Worker: sample one state's dots and pack them as POINT_DTYPE records.
+
+    Returns the shuffled points and the number of dots each entry is short;
+    the parent reports shortfalls by GEOID, so the worker's warning is muted.
+    """
+    rng = np.random.default_rng(seed)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        x, y, owner = sample_points(shapely.from_wkb(wkb), counts, rng)
+    points = np.empty(len(x), dtype=POINT_DTYPE)
+    points["x"], points["y"] = x, y
+    points["category"] = categories[owner]
+    shortfall = counts - np.bincount(owner, minlength=len(counts))
+    # Shuffle so no category is always drawn on top of the others
+    return points[rng.permutation(len(points))], shortfall
+
+
+def generate_dot_density(
+    csv_file,
+    json_file,
+    output_path,
+    columns,
+    people_per_dot=10,
+    workers=None,
+    seed=0,
+):
+    """
+    Write a dot-density point file with dots proportional to columns.
+
+    Each column becomes a category (its position in columns); each tract
+    gets round(value / people_per_dot) dots per category. States are sampled
+    in parallel worker processes with per-state seeds, so output is
+    reproducible for a given seed. Tracts whose geometry cannot hold their
+    dots (zero-area or null) are named in a warning and counted in the
+    metadata's "missing" entry.
+
+    Args:
+        csv_file (str): Processed CSV with a GEOID column
+        json_file (str): Tract GeoJSON
+        output_path (str): Binary output of POINT_DTYPE records
+        columns (list): Count columns, at most 256
+        people_per_dot (float): How many people each dot represents
+        workers (int): Worker processes (defaults to CPU count)
+        seed (int): Base random seed
+
+    Returns:
+        dict: Metadata written next to the output as <output_path>.json
+    """
+    if len(columns) > 256:
+        raise ValueError("At most 256 categories fit in a category byte")
+
+    df = pd.read_csv(csv_file, dtype={"GEOID": str}).set_index("GEOID")
+    gdf = gpd.read_file(json_file, columns=["GEOID"])
+    values = (
+        df.reindex(gdf["GEOID"].astype(str))[columns]
+        .apply(pd.to_numeric, errors="coerce")
+        .fillna(0)
+        .clip(lower=0)
+        .to_numpy()
+    )
+    dots = np.rint(values / people_per_dot).astype("int64")
+
+    # One entry per (tract, category) pair with at least one dot
+    tract_idx, category = np.nonzero(dots)
+    counts = dots[tract_idx, category]
+    states = gdf["GEOID"].astype(str).str[:2].to_numpy()[tract_idx]
+    wkb = shapely.to_wkb(np.asarray(gdf.geometry.values))
+
+    geoids = gdf["GEOID"].astype(str).to_numpy()
+    missing = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        masks = []
+        for i, state in enumerate(np.unique(states)):
+            mask = states == state
+            masks.append(mask)
+            state_seed = int(state) if state.isdigit() else i
+            futures.append(
+                executor.submit(
+                    _sample_partition,
+                    wkb[tract_idx[mask]],
+                    counts[mask],
+                    category[mask].astype("uint8"),
+                    [seed, state_seed],
+                )
+            )
+        points = []
+        for mask, future in zip(masks, futures):
+            state_points, shortfall = future.result()
+            points.append(state_points)
+            for tract, short in zip(tract_idx[mask], shortfall):
+                if short:
+                    geoid = geoids[tract]
+                    missing[geoid] = missing.get(geoid, 0) + int(short)
+
+    if missing:
+        warnings.warn(
+            f"{sum(missing.values())} dots could not be placed; tracts short "
+            f"of dots (GEOID: missing): {missing}"
+        )
+
+    points = np.concatenate(points) if points else np.empty(0, dtype=POINT_DTYPE)
+    points.tofile(output_path)
+
+    metadata = {
+        "format": "x:float32,y:float32,category:uint8 little-endian",
+        "record_bytes": POINT_DTYPE.itemsize,
+        "count": int(len(points)),
+        "missing": int(sum(missing.values())),
+        "people_per_dot": people_per_dot,
+        "categories": list(columns),
+        "bounds": [float(b) for b in gdf.total_bounds],
+    }
+    with open(f"{output_path}.json", "w") as f:
+        json.dump(metadata, f, indent=2)
+    print(f"Wrote {len(points)} dots to {output_path}")
+    return metadata
+
+
+def read_dot_density(path):
+    """Read a dot-density point file back as a POINT_DTYPE array."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    return np.fromfile(path, dtype=POINT_DTYPE)
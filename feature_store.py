@@ -0,0 +1,199 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from numpy.lib.format import open_memmap
+
+from manifest import file_sha256
+from visualization import CHOROPLETH_DIV_ID, build_choropleth_figure
+
+META_FILE = "store.json"
+
+
+class FeatureStore:
+    """
+    Render-ready tract table: one .npy file per variable, all aligned to a
+    sorted GEOID array, plus each row's feature index in the GeoJSON.
+
+    The join between table rows and geometry features happens once, when
+    the store is created. Columns are added or rewritten one at a time, and
+    maps are drawn straight from a column array.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE), "r") as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.geoids = np.load(os.path.join(path, "geoids.npy"))
+        self.features = np.load(os.path.join(path, "features.npy"))
+        self._positions = pd.Index(self.geoids)
+        self._geojson = None
+
+    @classmethod
+    def create(cls, path, json_file):
+        """
+        Build an empty store over a tract GeoJSON.
+
+        Args:
+            path (str): Store directory
+            json_file (str): Tract GeoJSON the feature indices point into
+
+        Returns:
+            FeatureStore: The new store
+        """
+        with open(json_file, "r") as f:
+            geojson_data = json.load(f)
+        if "features" not in geojson_data:
+            raise ValueError("Invalid GeoJSON structure: 'features' not found")
+
+        geoids = np.array(
+            [
+                str(feature["properties"]["GEOID"])
+                for feature in geojson_data["features"]
+            ]
+        )
+        if len(np.unique(geoids)) != len(geoids):
+            raise ValueError("GeoJSON has duplicate GEOIDs")
+        order = np.argsort(geoids, kind="stable")
+
+        os.makedirs(os.path.join(path, "columns"), exist_ok=True)
+        np.save(os.path.join(path, "geoids.npy"), geoids[order])
+        np.save(os.path.join(path, "features.npy"), order.astype("int32"))
+        meta = {
+            "geometry": os.path.abspath(json_file),
+            "geometry_sha256": file_sha256(json_file),
+            "columns": {},
+        }
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+        return cls(path)
+
+    @property
+    def columns(self):
+        return list(self.meta["columns"])
+
+    def _column_path(self, name):
+        return os.path.join(self.path, "columns", f"{name}.npy")
+
+    def _save_meta(self):
+        tmp = os.path.join(self.path, f"{META_FILE}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+    def align(self, values, geoids):
+        """Reorder values keyed by geoids into store row order (NaN if absent)."""
+        series = pd.Series(np.asarray(values), index=pd.Index(geoids).astype(str))
+        if series.index.has_duplicates:
+            raise ValueError("Duplicate GEOIDs in column update")
+        return series.reindex(self._positions).to_numpy()
+
+    def write_column(self, name, values, geoids=None):
+        """
+        Store one variable, overwriting only that column's file.
+
+        Args:
+            name (str): Column name
+            values (array-like): Values in store row order, or keyed by geoids
+            geoids (array-like): Optional GEOIDs of values
+        """
+        if geoids is not None:
+            values = self.align(values, geoids)
+        values = np.asarray(values)
+        if values.dtype.kind in "biuf":
+            values = values.astype("float64")
+        else:
+            values = np.array(["" if pd.isna(v) else str(v) for v in values], dtype=str)
+        if len(values) != len(self.geoids):
+            raise ValueError(
+                f"Column {name} has {len(values)} values for {len(self.geoids)} rows"
+            )
+
+        path = self._column_path(name)
+        if self.meta["columns"].get(name) == values.dtype.str:
+            # Same layout: write into the existing file
+            column = open_memmap(path, mode="r+")
+            column[:] = values
+            column.flush()
+            del column
+        else:
+            tmp = f"{path}.tmp.npy"
+            np.save(tmp, values)
+            os.replace(tmp, path)
+            self.meta["columns"][name] = values.dtype.str
+            self._save_meta()
+
+    def update(self, df, columns=None):
+        """
+        Write some columns of a GEOID-keyed DataFrame into the store.
+
+        Args:
+            df (pd.DataFrame): Table with a GEOID column
+            columns (list): Columns to write (defaults to all but GEOID)
+
+        Returns:
+            list: The columns written
+        """
+        if "GEOID" not in df.columns:
+            raise ValueError("DataFrame must contain a 'GEOID' column")
+        columns = columns or [col for col in df.columns if col != "GEOID"]
+        aligned = df.set_index(df["GEOID"].astype(str))[columns].reindex(
+            self._positions
+        )
+        for col in columns:
+            self.write_column(col, aligned[col].to_numpy())
+        return columns
+
+    def update_csv(self, csv_file, columns=None):
+        """Write columns of a processed CSV into the store."""
+        usecols = None if columns is None else ["GEOID", *columns]
+        df = pd.read_csv(csv_file, dtype={"GEOID": str}, usecols=usecols)
+        return self.update(df, columns)
+
+    def column(self, name):
+        """Return a read-only, memory-mapped column in store row order."""
+        if name not in self.meta["columns"]:
+            raise KeyError(f"No column {name} in feature store")
+        return np.load(self._column_path(name), mmap_mode="r")
+
+    def to_frame(self, columns=None):
+        """Return the store (or some columns) as a DataFrame."""
+        columns = self.columns if columns is None else columns
+        data = {"GEOID": self.geoids}
+        data.update({col: np.asarray(self.column(col)) for col in columns})
+        return pd.DataFrame(data)
+
+    def geojson(self):
+        """
+        Load the geometry once, with each feature's GEOID as its id, in
+        store row order so features line up with every column.
+        """
+        if self._geojson is None:
+            if file_sha256(self.meta["geometry"]) != self.meta["geometry_sha256"]:
+                raise ValueError("Geometry changed since the store was built")
+            with open(self.meta["geometry"], "r") as f:
+                geojson_data = json.load(f)
+            features = [geojson_data["features"][i] for i in self.features]
+            for geoid, feature in zip(self.geoids, features):
+                feature["id"] = str(geoid)
+            geojson_data["features"] = features
+            self._geojson = geojson_data
+        return self._geojson
+
+    def figure(self, column, **kwargs):
+        """Build a choropleth for one column without joining at render time."""
+        df = pd.DataFrame({"GEOID": self.geoids, column: self.column(column)})
+        return build_choropleth_figure(
+            df, self.geojson(), column, featureidkey="id", **kwargs
+        )
+
+    def write_html(self, column, token_file, output_html, **kwargs):
+        """Render one column to an interactive HTML map."""
+        with open(token_file, "r") as f:
+            px.set_mapbox_access_token(f.read().strip())
+        fig = self.figure(column, **kwargs)
+        fig.write_html(output_html, div_id=CHOROPLETH_DIV_ID)
+        print(f"Choropleth map saved to: {output_html}")
+        return fig
@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+from urllib.parse import urljoin, urlsplit
+
+# TIGER/Line tract shapefiles, one zip per state or territory. The file
+# names end in "_tract.zip", which is what extract_shapefiles looks for.
+TIGER_TRACT_URL = (
+    "https://www2.census.gov/geo/tiger/TIGER{year}/TRACT/tl_{year}_{fips}_tract.zip"
+)
+
+# 50 states, DC, Puerto Rico and the four island areas
+STATE_FIPS = [
+    "01", "02", "04", "05", "06", "08", "09", "10", "11", "12", "13", "15",
+    "16", "17", "18", "19", "20", "21", "22", "23", "24", "25", "26", "27",
+    "28", "29", "30", "31", "32", "33", "34", "35", "36", "37", "38", "39",
+    "40", "41", "42", "44", "45", "46", "47", "48", "49", "50", "51", "53",
+    "54", "55", "56", "60", "66", "69", "72", "78",
+]  # fmt: skip
+
+CHUNK_SIZE = 1 << 20
+MAX_REDIRECTS = 5
+
+
+def tiger_tract_downloads(zip_directory, year=2021, fips_codes=STATE_FIPS):
+    """Map each TIGER tract zip URL to its path in the zip directory."""
+    downloads = {}
+    for fips in fips_codes:
+        url = TIGER_TRACT_URL.format(year=year, fips=fips)
+        downloads[url] = os.path.join(zip_directory, os.path.basename(url))
+    return downloads
+
+
+def _meta_path(path):
+    return f"{path}.meta.json"
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_meta(path):
+    """Return cache metadata if the file on disk still matches its checksum."""
+    try:
+        with open(_meta_path(path)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(path) or _sha256(path) != meta.get("sha256"):
+        return None
+    return meta
+
+
+class ConnectionPool:
+    """Reusable keep-alive HTTP connections, bounded per event loop."""
+
+    def __init__(self, size=8, timeout=60):
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+    def _connect(self, scheme, netloc):
+        cls = (
+            http.client.HTTPSConnection
+            if scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return cls(netloc, timeout=self.timeout)
+
+    async def request(self, url, headers, path):
+        """
+        GET url, streaming a 200 response body into path.
+
+        Returns:
+            tuple: (status, response headers, sha256 of the body or None)
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+
+        async with self._slots:
+            idle = self._idle.setdefault(key, [])
+            reused = bool(idle)
+            conn = idle.pop() if idle else self._connect(*key)
+            try:
+                result = await asyncio.to_thread(_transfer, conn, target, headers, path)
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed a pooled keep-alive connection; retry once
+                conn = self._connect(*key)
+                result = await asyncio.to_thread(_transfer, conn, target, headers, path)
+            status, response_headers, checksum, keep_alive = result
+            if keep_alive:
+                idle.append(conn)
+            else:
+                conn.close()
+        return status, response_headers, checksum
+
+
+def _transfer(conn, target, headers, path):
+    """Blocking request/response exchange, run in a worker thread."""
+    conn.request("GET", target, headers=headers)
+    response = conn.getresponse()
+    checksum = None
+    if response.status == 200:
+        digest = hashlib.sha256()
+        partial = f"{path}.part"
+        with open(partial, "wb") as f:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(partial, path)
+        checksum = digest.hexdigest()
+    else:
+        response.read()
+    keep_alive = not response.will_close
+    # response.headers is an HTTPMessage, so lookups ignore header case
+    return response.status, response.headers, checksum, keep_alive
+
+
+async def _fetch_one(pool, url, path, expected_sha256=None):
+    """Download url to path unless the cached copy is still current."""
+    meta = _load_meta(path)
+    if meta and expected_sha256 and meta["sha256"] == expected_sha256:
+        return "cached"
+
+    headers = {"Accept-Encoding": "identity"}
+    if meta and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta and meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    request_url = url
+    for _ in range(MAX_REDIRECTS + 1):
+        status, response_headers, checksum = await pool.request(
+            request_url, headers, path
+        )
+        if status in (301, 302, 303, 307, 308):
+            location = response_headers.get("Location")
+            if not location:
+                raise IOError(f"Redirect without a Location header from {url}")
+            request_url = urljoin(request_url, location)
+            continue
+        break
+
+    if status == 304 and meta:
+        return "cached"
+    if status != 200:
+        raise IOError(f"Failed to fetch {url}: HTTP {status}")
+    if expected_sha256 and checksum != expected_sha256:
+        os.remove(path)
+        raise IOError(f"Checksum mismatch for {url}")
+
+    with open(_meta_path(path), "w") as f:
+        json.dump(
+            {
+                "url": url,
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+                "sha256": checksum,
+            },
+            f,
+        )
+    return "downloaded"
+
+
+async def fetch_all(downloads, concurrency=8, checksums=None):
+    """
+    Fetch many files concurrently over a shared connection pool.
+
+    Args:
+        downloads (dict): URL -> local path
+        concurrency (int): Maximum simultaneous requests
+        checksums (dict): Optional URL -> expected sha256
+
+    Returns:
+        dict: URL -> "downloaded", "cached" or the exception raised
+    """
+    checksums = checksums or {}
+    async with ConnectionPool(concurrency) as pool:
+        results = await asyncio.gather(
+            *(
+                _fetch_one(pool, url, path, checksums.get(url))
+                for url, path in downloads.items()
+            ),
+            return_exceptions=True,
+        )
+    return dict(zip(downloads, results))
+
+
+def fetch_inputs(downloads, concurrency=8, checksums=None):
+    """
+    Synchronously fetch pipeline inputs into the local cache.
+
+    Args:
+        downloads (dict): URL -> local path (see tiger_tract_downloads)
+        concurrency (int): Maximum simultaneous requests
+        checksums (dict): Optional URL -> expected sha256
+
+    Returns:
+        dict: URL -> "downloaded" or "cached"
+    """
+    results = asyncio.run(fetch_all(downloads, concurrency, checksums))
+    failed = {url: r for url, r in results.items() if isinstance(r, Exception)}
+    for url, error in failed.items():
+        print(f"Error fetching {url}: {error}")
+    if failed:
+        raise IOError(f"{len(failed)} of {len(results)} downloads failed")
+
+    downloaded = sum(1 for r in results.values() if r == "downloaded")
+    print(f"Fetched {downloaded} files, {len(results) - downloaded} up to date")
+    return results
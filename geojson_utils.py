@@ -1,9 +1,39 @@
 import os
+import json
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import shapely
 import zipfile
 import tempfile
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from projection import (
+    REGIONAL,
+    TIGER_CRS,
+    WGS84,
+    from_regional,
+    state_codes,
+    to_crs,
+    to_regional,
+    to_wgs84,
+    units_per_degree,
+)
+
+# TIGER tract properties kept by the schema stage and the dtype each is
+# stored as. Everything else (MTFCC, FUNCSTAT, INTPTLAT, ...) is dropped.
+# Land and water areas are whole square metres, up to ~1e11 in Alaska, so
+# they stay int64: float32 would round them to the nearest few thousand.
+TRACT_SCHEMA = {
+    "GEOID": "str",
+    "STATEFP": "category",
+    "COUNTYFP": "category",
+    "NAMELSAD": "category",
+    "ALAND": "int64",
+    "AWATER": "int64",
+}
 
 
 def extract_shapefiles(zip_directory, temp_dir):
@@ -15,44 +45,403 @@ def extract_shapefiles(zip_directory, temp_dir):
                 zip_ref.extractall(temp_dir)
 
 
-def simplify_geojson(input_path, output_path, tolerance=0.01):
-    """Simplify a GeoJSON file while preserving topology."""
+def apply_tract_schema(gdf, schema=TRACT_SCHEMA):
+    """Keep only the schema's properties and cast them to compact dtypes."""
+    keep = [col for col in schema if col in gdf.columns]
+    gdf = gdf[keep + [gdf.geometry.name]]
+    return gdf.astype({col: schema[col] for col in keep})
+
+
+def read_tracts(path, schema=TRACT_SCHEMA, **kwargs):
+    """Read tract features, selecting only the schema's columns at read time."""
+    gdf = gpd.read_file(path, columns=list(schema), **kwargs)
+    return apply_tract_schema(gdf, schema)
+
+
+def _simplify_wkb_range(shm_name, offsets, tolerance):
+    """Simplify one contiguous run of WKB geometries held in shared memory."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        wkb = [bytes(shm.buf[start:end]) for start, end in zip(offsets, offsets[1:])]
+    finally:
+        shm.close()
+    geoms = shapely.simplify(shapely.from_wkb(wkb), tolerance, preserve_topology=True)
+    return shapely.to_wkb(geoms)
+
+
+def _partition_keys(gdf, partition, n_chunks):
+    """Label each feature with the partition it is simplified in."""
+    if partition == "state":
+        return gdf["GEOID"].astype(str).str[:2].to_numpy()
+    if partition == "spatial":
+        # Equal-count vertical strips keep neighbouring tracts together
+        x = shapely.get_x(shapely.centroid(np.asarray(gdf.geometry.values)))
+        ranks = np.argsort(np.argsort(x, kind="stable"), kind="stable")
+        return ranks * n_chunks // max(len(x), 1)
+    raise ValueError(f"Unknown partition mode: {partition}")
+
+
+def simplify_parallel(gdf, tolerance, workers=None, partition="state"):
+    """
+    Simplify geometries in worker processes, one partition per task.
+
+    Geometries are written once as WKB into a shared memory block ordered by
+    partition, so each worker only receives the offsets of its run. Results
+    are reassembled in the original feature order.
+
+    Args:
+        gdf (gpd.GeoDataFrame): Features to simplify
+        tolerance (float): Simplification tolerance in CRS units
+        workers (int): Number of worker processes (defaults to CPU count)
+        partition (str): "state" (first two GEOID digits) or "spatial"
+
+    Returns:
+        gpd.GeoSeries: Simplified geometries aligned to gdf
+    """
+    if len(gdf) == 0:
+        return gdf.geometry.copy()
+
+    workers = workers or os.cpu_count() or 1
+    keys = _partition_keys(gdf, partition, workers)
+    order = np.argsort(keys, kind="stable")
+    _, starts = np.unique(keys[order], return_index=True)
+    bounds = list(starts) + [len(order)]
+
+    wkb = shapely.to_wkb(np.asarray(gdf.geometry.values)[order])
+    offsets = np.concatenate([[0], np.cumsum([len(b) for b in wkb])])
+
+    shm = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]), 1))
+    try:
+        shm.buf[: offsets[-1]] = b"".join(wkb)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _simplify_wkb_range,
+                    shm.name,
+                    offsets[lo : hi + 1].tolist(),
+                    tolerance,
+                )
+                for lo, hi in zip(bounds, bounds[1:])
+            ]
+            simplified = np.concatenate([f.result() for f in futures])
+    finally:
+        shm.close()
+        shm.unlink()
+
+    result = np.empty(len(order), dtype=object)
+    result[order] = shapely.from_wkb(simplified)
+    return gpd.GeoSeries(result, index=gdf.index, crs=gdf.crs)
+
+
+def reduce_precision(geometries, grid_size=1e-5):
+    """Snap coordinates to a grid, keeping every geometry valid."""
+    return shapely.set_precision(np.asarray(geometries), grid_size, mode="valid_output")
+
+
+def _payload_size(geometries, max_vertices, max_bytes):
+    """Return (vertices, bytes, fits) for the given budgets."""
+    vertices = int(shapely.get_num_coordinates(geometries).sum())
+    size = 0
+    if max_bytes is not None:
+        size = int(sum(map(len, shapely.to_geojson(geometries))))
+    fits = (max_vertices is None or vertices <= max_vertices) and (
+        max_bytes is None or size <= max_bytes
+    )
+    return vertices, size, fits
+
+
+def simplify_to_budget(
+    geometries,
+    max_vertices=None,
+    max_bytes=None,
+    max_feature_vertices=None,
+    min_tolerance=1e-6,
+    max_tolerance=1.0,
+    iterations=20,
+):
+    """
+    Find the smallest simplification tolerance that fits a payload budget.
+
+    A single tolerance is bisected (in log space) until the total vertex
+    count and/or GeoJSON geometry bytes fit. Features still above
+    max_feature_vertices then have their own tolerance doubled until they
+    fit too.
+
+    Args:
+        geometries (array-like): Geometries to simplify
+        max_vertices (int): Target total vertex count
+        max_bytes (int): Target total GeoJSON geometry size in bytes
+        max_feature_vertices (int): Per-feature vertex cap
+        min_tolerance (float): Smallest tolerance tried
+        max_tolerance (float): Largest tolerance tried
+        iterations (int): Bisection steps
+
+    Returns:
+        tuple: (simplified geometry array, tolerance used per feature)
+
+    Raises:
+        ValueError: If the budget cannot be met even at max_tolerance
+    """
+    geometries = np.asarray(geometries)
+
+    def simplify(tolerance):
+        return shapely.simplify(geometries, tolerance, preserve_topology=True)
+
+    tolerance = 0.0
+    result = geometries.copy()
+    if not _payload_size(geometries, max_vertices, max_bytes)[2]:
+        low, high = np.log(min_tolerance), np.log(max_tolerance)
+        tolerance, result = max_tolerance, simplify(max_tolerance)
+        for _ in range(iterations):
+            mid = (low + high) / 2
+            candidate = simplify(np.exp(mid))
+            if _payload_size(candidate, max_vertices, max_bytes)[2]:
+                high, tolerance, result = mid, np.exp(mid), candidate
+            else:
+                low = mid
+
+    tolerances = np.full(len(geometries), tolerance, dtype="float64")
+    if max_feature_vertices is not None:
+        for _ in range(iterations):
+            over = shapely.get_num_coordinates(result) > max_feature_vertices
+            if not over.any():
+                break
+            tolerances[over] = np.maximum(tolerances[over] * 2, min_tolerance)
+            result[over] = shapely.simplify(
+                geometries[over], tolerances[over], preserve_topology=True
+            )
+
+    # Never hand back an over-budget result as if it fit
+    vertices, size, fits = _payload_size(result, max_vertices, max_bytes)
+    over = 0
+    if max_feature_vertices is not None:
+        over = int((shapely.get_num_coordinates(result) > max_feature_vertices).sum())
+    if not fits or over:
+        raise ValueError(
+            f"Budget not met at tolerance <= {max_tolerance}: {vertices} vertices, "
+            f"{size} bytes, {over} features over the per-feature cap"
+        )
+    return result, tolerances
+
+
+def simplify_geojson(
+    input_path,
+    output_path,
+    tolerance=0.01,
+    workers=None,
+    partition="state",
+    schema=None,
+    grid_size=None,
+    max_vertices=None,
+    max_bytes=None,
+    max_feature_vertices=None,
+    crs=None,
+):
+    """Simplify a GeoJSON file while preserving topology.
+
+    Pass workers > 1 to simplify partitions of the file in parallel, and a
+    schema (e.g. TRACT_SCHEMA) to drop unused properties at read time.
+    grid_size snaps coordinates to a grid (about 1e-5 degrees is ~1 m) and
+    trims the written precision to match. Any of the max_* budgets replaces
+    the fixed tolerance with the smallest one that fits. With crs
+    geometries are simplified in that projection, so tolerance and the
+    budget search range are in its units, and written back as WGS84.
+    crs=projection.REGIONAL simplifies each state in its regional
+    equal-area CRS, so a tolerance in metres means the same everywhere.
+    """
     try:
         # Read the input GeoJSON
-        gdf = gpd.read_file(input_path)
+        if schema:
+            gdf = read_tracts(input_path, schema)
+        else:
+            gdf = gpd.read_file(input_path)
+        if crs == REGIONAL:
+            projected, partitions = to_regional(
+                gdf.geometry.values, state_codes(gdf), gdf.crs or TIGER_CRS
+            )
+            gdf = gdf.set_geometry(gpd.GeoSeries(projected, index=gdf.index))
+        elif crs:
+            gdf = to_crs(gdf, crs)
 
         # Simplify geometries
-        gdf.geometry = gdf.geometry.simplify(tolerance, preserve_topology=True)
+        if max_vertices or max_bytes or max_feature_vertices:
+            # The bisection bounds are in degrees; rescale them to the CRS
+            scale = units_per_degree(crs) if crs else 1.0
+            simplified, tolerances = simplify_to_budget(
+                gdf.geometry.values,
+                max_vertices,
+                max_bytes,
+                max_feature_vertices,
+                min_tolerance=1e-6 * scale,
+                max_tolerance=1.0 * scale,
+            )
+            vertices, size, _ = _payload_size(simplified, max_vertices, max_bytes)
+            print(
+                f"Simplified to {vertices} vertices"
+                + (f", {size} geometry bytes" if max_bytes else "")
+                + f" (tolerance {tolerances.min():g}-{tolerances.max():g})"
+            )
+            gdf.geometry = gpd.GeoSeries(simplified, index=gdf.index, crs=gdf.crs)
+        elif workers and workers > 1:
+            gdf.geometry = simplify_parallel(gdf, tolerance, workers, partition)
+        else:
+            gdf.geometry = gdf.geometry.simplify(tolerance, preserve_topology=True)
+        if crs == REGIONAL:
+            geometries = from_regional(gdf.geometry.values, partitions)
+            gdf = gdf.set_geometry(
+                gpd.GeoSeries(geometries, index=gdf.index, crs=WGS84)
+            )
+        elif crs:
+            gdf = to_wgs84(gdf)
+
+        # Snap coordinates and write only the digits the grid keeps
+        options = {}
+        if grid_size:
+            gdf.geometry = gpd.GeoSeries(
+                reduce_precision(gdf.geometry.values, grid_size),
+                index=gdf.index,
+                crs=gdf.crs,
+            )
+            options["COORDINATE_PRECISION"] = max(
+                0, -int(np.floor(np.log10(grid_size)))
+            )
 
         # Write simplified GeoJSON
-        gdf.to_file(output_path, driver="GeoJSON")
+        gdf.to_file(output_path, driver="GeoJSON", **options)
         return output_path
-    except Exception:
+    except Exception as e:
+        print(f"Error simplifying GeoJSON: {e}")
         return None
 
 
-def convert_to_geojson(shp_dir, output_geojson_path):
-    # If it's a directory, look inside; otherwise
-    # you might have code to unzip first (not shown here)
-    if not os.path.isdir(shp_dir):
-        print("No shapefiles found after extraction")
+def repair_geometries(geometries):
+    """Rebuild invalid geometries with buffer(0) in one vectorized pass."""
+    geometries = np.array(geometries, dtype=object)
+    invalid = ~shapely.is_valid(geometries) & ~shapely.is_missing(geometries)
+    if invalid.any():
+        geometries[invalid] = shapely.buffer(geometries[invalid], 0)
+    return geometries
+
+
+def _read_repaired(shp_path, schema=None):
+    """Read one shapefile and repair any invalid geometries."""
+    gdf = read_tracts(shp_path, schema) if schema else gpd.read_file(shp_path)
+    gdf["geometry"] = gpd.GeoSeries(
+        repair_geometries(gdf.geometry.values), index=gdf.index, crs=gdf.crs
+    )
+    return gdf
+
+
+def _geojson_header(crs):
+    """Opening of a FeatureCollection, naming the CRS unless it is WGS84."""
+    header = {"type": "FeatureCollection"}
+    epsg = crs.to_epsg() if crs is not None else None
+    if epsg not in (None, 4326):
+        header["crs"] = {
+            "type": "name",
+            "properties": {"name": f"urn:ogc:def:crs:EPSG::{epsg}"},
+        }
+    return json.dumps(header)[:-1] + ', "features": [\n'
+
+
+def _stream_to_geojson(shp_paths, output_path, schema=None):
+    """
+    Append each shapefile's features to a GeoJSON file as it is read.
+
+    Only one state's GeoDataFrame is held in memory at a time. Later files
+    are reprojected to the CRS of the first one so the collection stays
+    consistent.
+
+    Args:
+        shp_paths (list): Shapefiles to combine, in output order
+        output_path (str): Path to save the output GeoJSON file
+        schema (dict): Optional property schema applied at read time
+
+    Returns:
+        int: Number of features written, or None if no file could be read
+    """
+    crs = None
+    started = False
+    written = 0
+    with open(output_path, "w") as f:
+        for shp_path in shp_paths:
+            try:
+                gdf = _read_repaired(shp_path, schema)
+            except Exception as e:
+                print(f"Error reading {shp_path}: {e}")
+                continue
+
+            if not started:
+                started = True
+                crs = gdf.crs
+                f.write(_geojson_header(crs))
+            elif crs is not None and gdf.crs is not None and gdf.crs != crs:
+                gdf = gdf.to_crs(crs)
+
+            for feature in gdf.iterfeatures(na="null", drop_id=True):
+                f.write(",\n" if written else "")
+                f.write(json.dumps(feature))
+                written += 1
+            del gdf
+
+        if not started:
+            return None
+        f.write("\n]}\n")
+    return written
+
+
+def convert_to_geojson(directory, output_path, stream=False, schema=None):
+    """
+    Convert shapefiles in a directory to a single GeoJSON file.
+
+    Args:
+        directory (str): Directory containing shapefiles
+        output_path (str): Path to save the output GeoJSON file
+        stream (bool): Write each shapefile's features as soon as it is read
+            instead of concatenating every state in memory first
+        schema (dict): Keep only these properties, cast to compact dtypes
+            (see geojson_utils.TRACT_SCHEMA)
+
+    Returns:
+        str: Path to the output file if successful, None otherwise
+    """
+    if not os.path.isdir(directory):
+        print(f"Directory not found: {directory}")
         return None
 
-    # Find any .shp file
-    candidates = [
-        os.path.join(shp_dir, f)
-        for f in os.listdir(shp_dir)
-        if f.lower().endswith(".shp")
-    ]
-    if not candidates:
-        print("No shapefiles found after extraction")
+    shp_files = sorted(f for f in os.listdir(directory) if f.endswith(".shp"))
+    if not shp_files:
+        print("No shapefiles found in directory")
         return None
 
-    shp_path = candidates[0]
     try:
-        gdf = gpd.read_file(shp_path)
-        gdf.to_file(output_geojson_path, driver="GeoJSON")
-        return output_geojson_path
-    except Exception:
-        print("Failed to create GeoJSON file")
+        if stream:
+            shp_paths = [os.path.join(directory, f) for f in shp_files]
+            if _stream_to_geojson(shp_paths, output_path, schema) is None:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                print("No valid shapefiles could be read")
+                return None
+            return output_path
+
+        gdf_list = []
+        for shp_file in shp_files:
+            shp_path = os.path.join(directory, shp_file)
+            try:
+                # Check if there are invalid geometries and repair them
+                gdf = _read_repaired(shp_path, schema)
+                gdf_list.append(gdf)
+            except Exception as e:
+                print(f"Error reading {shp_path}: {e}")
+
+        if not gdf_list:
+            print("No valid shapefiles could be read")
+            return None
+
+        combined_gdf = gpd.GeoDataFrame(pd.concat(gdf_list, ignore_index=True))
+        combined_gdf.to_file(output_path, driver="GeoJSON")
+        return output_path
+
+    except Exception as e:
+        print(f"Error converting to GeoJSON: {e}")
         return None
@@ -11,6 +11,8 @@ from config import (
     CHOROPLETH_HTML_PATH,
 )
 from data_processing import process_acs_csv
+from manifest import write_manifest
+from validation import validate_acs_csv
 from visualization import generate_choropleth
 
 # ACS Column Documentation:
@@ -48,8 +50,10 @@ def main():
     }
 
     try:
+        # Keep the full GEOID after the "1400000US" prefix so rows join to
+        # the tract features
         dtypes, missing = process_acs_csv(
-            RAW_CSV_PATH, PROCESSED_CSV_PATH, column_mapping
+            RAW_CSV_PATH, PROCESSED_CSV_PATH, column_mapping, tract_geoids=True
         )
         print("Data Types:\n", dtypes)
         print("\nMissing Values:\n", missing)
@@ -57,6 +61,26 @@ def main():
         print(f"Error processing ACS data: {e}")
         sys.exit(1)
 
+    # Validate the processed table before it reaches the map
+    report_path = os.path.join(
+        os.path.dirname(PROCESSED_CSV_PATH), "validation_report.json"
+    )
+    try:
+        report = validate_acs_csv(
+            RAW_CSV_PATH,
+            PROCESSED_CSV_PATH,
+            column_mapping,
+            SIMPLIFIED_JSON_PATH,
+            report_path,
+        )
+    except Exception as e:
+        print(f"Error validating ACS data: {e}")
+        sys.exit(1)
+    print("Validation report saved to:", report_path)
+    if not report["passed"]:
+        print(f"Validation failed: {', '.join(report['errors'])}")
+        sys.exit(1)
+
     # Create visualization
     try:
         generate_choropleth(
@@ -70,6 +94,19 @@ def main():
         print(f"Error generating choropleth: {e}")
         sys.exit(1)
 
+    # Record content hashes so caches only move artifacts that changed
+    manifest_path = os.path.join(os.path.dirname(CHOROPLETH_HTML_PATH), "manifest.json")
+    write_manifest(
+        [
+            PROCESSED_CSV_PATH,
+            SIMPLIFIED_JSON_PATH,
+            report_path,
+            CHOROPLETH_HTML_PATH,
+        ],
+        manifest_path,
+    )
+    print("Manifest saved to:", manifest_path)
+
 
 if __name__ == "__main__":
     main()
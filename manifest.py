@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+
+CHUNK_SIZE = 1 << 20
+
+
+def file_sha256(path):
+    """Return the hex sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(paths, root=None):
+    """
+    Describe each artifact by content hash and size.
+
+    Args:
+        paths (list): Artifact files; missing files are skipped
+        root (str): Directory names are made relative to (defaults to the
+            directory of each file)
+
+    Returns:
+        dict: {"artifacts": {name: {"sha256": ..., "bytes": ...}}}
+    """
+    artifacts = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        name = os.path.relpath(path, root) if root else os.path.basename(path)
+        artifacts[name.replace(os.sep, "/")] = {
+            "sha256": file_sha256(path),
+            "bytes": os.path.getsize(path),
+        }
+    return {"artifacts": dict(sorted(artifacts.items()))}
+
+
+def write_manifest(paths, manifest_path):
+    """
+    Write a manifest of content hashes for the given artifacts.
+
+    Names are relative to the manifest's directory and keys are sorted, so
+    identical artifacts always produce an identical manifest.
+
+    Args:
+        paths (list): Artifact files to record
+        manifest_path (str): Path to save the manifest JSON
+
+    Returns:
+        dict: The manifest that was written
+    """
+    manifest = build_manifest(paths, root=os.path.dirname(manifest_path) or ".")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return manifest
+
+
+def changed_artifacts(old_manifest, new_manifest):
+    """List artifact names whose content differs from the previous manifest."""
+    old = old_manifest.get("artifacts", {})
+    return [
+        name
+        for name, entry in new_manifest["artifacts"].items()
+        if old.get(name, {}).get("sha256") != entry["sha256"]
+    ]
@@ -0,0 +1,217 @@
+import argparse
+import json
+import math
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from config import PROCESSED_CSV_PATH, SIMPLIFIED_JSON_PATH, ACCESS_TOKEN_PATH
+from visualization import build_choropleth_figure
+
+CLASSIFICATION_SCHEMES = ("continuous", "quantile", "equal")
+
+
+def load_map_data(csv_file, json_file):
+    """
+    Load the processed ACS table and tract GeoJSON once for serving.
+
+    Args:
+        csv_file: Path to processed CSV (output of process_acs_csv)
+        json_file: Path to GeoJSON with tract boundaries
+
+    Returns:
+        tuple: (DataFrame indexed by GEOID, GeoJSON dict, GeoDataFrame of
+        feature GEOIDs and bounds aligned to the GeoJSON features)
+    """
+    df = pd.read_csv(csv_file, dtype={"GEOID": str})
+    if "GEOID" not in df.columns:
+        raise ValueError("CSV file must contain a 'GEOID' column")
+
+    with open(json_file, "r") as f:
+        geojson_data = json.load(f)
+    if "features" not in geojson_data:
+        raise ValueError("Invalid GeoJSON structure: 'features' not found")
+
+    features = gpd.GeoDataFrame.from_features(geojson_data["features"])
+    bounds = features.bounds
+    bounds["GEOID"] = features["GEOID"].astype(str).to_numpy()
+    return df, geojson_data, bounds
+
+
+def classify(values, scheme="continuous", classes=5):
+    """
+    Map values to the numbers that are colored for a classification scheme.
+
+    Args:
+        values (pd.Series): Values to classify
+        scheme (str): "continuous", "quantile" or "equal" (interval)
+        classes (int): Number of classes for binned schemes
+
+    Returns:
+        tuple: (Series of colored values, (min, max) color range)
+    """
+    if scheme == "continuous":
+        return values, (0, values.quantile(0.99))
+    if scheme == "quantile":
+        binned = pd.qcut(values, classes, labels=False, duplicates="drop")
+    elif scheme == "equal":
+        binned = pd.cut(values, classes, labels=False)
+    else:
+        raise ValueError(f"Unknown classification scheme: {scheme}")
+    return binned, (0, classes - 1)
+
+
+def _view_for_bounds(bounds):
+    """Approximate a Mapbox center and zoom that fit the given bounds."""
+    minx, miny = bounds["minx"].min(), bounds["miny"].min()
+    maxx, maxy = bounds["maxx"].max(), bounds["maxy"].max()
+    extent = max(maxx - minx, (maxy - miny) * 2, 1e-6)
+    zoom = float(np.clip(math.log2(360 / extent), 3, 12))
+    return {"lat": (miny + maxy) / 2, "lon": (minx + maxx) / 2}, zoom
+
+
+def make_renderer(df, geojson_data, bounds, cache_size=128):
+    """
+    Build a render function whose responses are cached in an LRU.
+
+    The cache key is the request parameters (column, region, scheme,
+    classes), so repeated requests skip figure building and serialization.
+
+    Args:
+        df: Processed ACS table with a GEOID column
+        geojson_data: Tract GeoJSON dict
+        bounds: Feature GEOIDs and bounds from load_map_data
+        cache_size (int): Maximum number of cached responses
+
+    Returns:
+        callable: render(column, region, scheme, classes) -> HTML str
+    """
+    features = geojson_data["features"]
+    feature_geoids = bounds["GEOID"]
+
+    @lru_cache(maxsize=cache_size)
+    def render(column, region="", scheme="continuous", classes=5):
+        if column == "GEOID" or column not in df.columns:
+            raise KeyError(f"Unknown column: {column}")
+
+        mask = feature_geoids.str.startswith(region).to_numpy()
+        if not mask.any():
+            raise LookupError(f"No tracts found for region: {region!r}")
+
+        subset = df[df["GEOID"].str.startswith(region)]
+        values, range_color = classify(
+            pd.to_numeric(subset[column], errors="coerce"), scheme, classes
+        )
+        subset = subset.assign(**{column: values})
+        region_geojson = {
+            "type": "FeatureCollection",
+            "features": [features[i] for i in np.flatnonzero(mask)],
+        }
+        center, zoom = _view_for_bounds(bounds[mask])
+
+        fig = build_choropleth_figure(
+            subset,
+            region_geojson,
+            column=column,
+            range_color=range_color,
+            center=center,
+            zoom=zoom,
+            title=column.replace("_", " "),
+        )
+        return fig.to_html(include_plotlyjs="cdn", full_html=True)
+
+    return render
+
+
+def make_server(
+    csv_file=PROCESSED_CSV_PATH,
+    json_file=SIMPLIFIED_JSON_PATH,
+    token_file=ACCESS_TOKEN_PATH,
+    host="127.0.0.1",
+    port=8050,
+    cache_size=128,
+):
+    """
+    Create a threaded HTTP server that renders maps on demand.
+
+    GET /map?column=Total_Population&region=06&scheme=quantile&classes=5
+    returns an HTML map of the tracts whose GEOID starts with region.
+
+    Args:
+        csv_file: Path to processed CSV with tract data
+        json_file: Path to GeoJSON with tract boundaries
+        token_file: Path to Mapbox access token file (optional)
+        host (str): Interface to bind
+        port (int): Port to bind (0 picks a free port)
+        cache_size (int): Maximum number of cached responses
+
+    Returns:
+        ThreadingHTTPServer: Call serve_forever() to start serving
+    """
+    df, geojson_data, bounds = load_map_data(csv_file, json_file)
+    render = make_renderer(df, geojson_data, bounds, cache_size)
+
+    if token_file:
+        try:
+            with open(token_file, "r") as f:
+                px.set_mapbox_access_token(f.read().strip())
+        except OSError:
+            print(f"No Mapbox token found at {token_file}")
+
+    class MapRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type="text/plain; charset=utf-8"):
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/cache":
+                self._send(200, json.dumps(render.cache_info()._asdict()))
+                return
+            if url.path != "/map":
+                self._send(404, "Not found")
+                return
+
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                html = render(
+                    params.get("column", "Total_Population"),
+                    params.get("region", ""),
+                    params.get("scheme", "continuous"),
+                    int(params.get("classes", 5)),
+                )
+            except KeyError as e:
+                self._send(400, str(e))
+            except LookupError as e:
+                self._send(404, str(e))
+            except ValueError as e:
+                self._send(400, str(e))
+            else:
+                self._send(200, html, "text/html; charset=utf-8")
+
+    server = ThreadingHTTPServer((host, port), MapRequestHandler)
+    server.render = render
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve choropleth maps locally")
+    parser.add_argument("--csv", default=PROCESSED_CSV_PATH)
+    parser.add_argument("--geojson", default=SIMPLIFIED_JSON_PATH)
+    parser.add_argument("--token", default=ACCESS_TOKEN_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    args = parser.parse_args()
+
+    server = make_server(args.csv, args.geojson, args.token, args.host, args.port)
+    print(f"Serving maps on http://{args.host}:{server.server_port}/map")
+    server.serve_forever()
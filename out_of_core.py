@@ -0,0 +1,396 @@
+import json
+import os
+import shutil
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import CRS
+
+from adjacency import pairs_to_adjacency, shares_edge
+from geojson_utils import _geojson_header, read_tracts, repair_geometries
+from projection import (
+    REGIONAL,
+    TIGER_CRS,
+    WGS84,
+    from_regional,
+    reproject,
+    state_codes,
+    to_regional,
+)
+
+CHUNK_SIZE = 10_000
+
+# Each buffer directory holds two ragged byte arrays (geometry WKB and
+# per-feature property JSON), each with an int64 offsets index of count + 1
+# entries, plus meta.json with the count and CRS.
+_ARRAYS = ("wkb", "properties")
+
+
+class GeometryBuffer:
+    """Read-only, memory-mapped view of a geometry buffer directory."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        self.path = path
+        self._data, self._offsets = {}, {}
+        for name in _ARRAYS:
+            self._offsets[name] = np.memmap(
+                os.path.join(path, f"{name}.offsets"), dtype="<i8", mode="r"
+            )
+            data_path = os.path.join(path, f"{name}.bin")
+            # np.memmap cannot map an empty file
+            self._data[name] = (
+                np.memmap(data_path, dtype="u1", mode="r")
+                if os.path.getsize(data_path)
+                else np.empty(0, dtype="u1")
+            )
+
+    def __len__(self):
+        return self.meta["count"]
+
+    @property
+    def crs(self):
+        return CRS.from_wkt(self.meta["crs"]) if self.meta["crs"] else None
+
+    def _slice(self, name, start, stop):
+        """Copy items start..stop of one ragged array out of the mapping."""
+        offsets = np.asarray(self._offsets[name][start : stop + 1])
+        buf = self._data[name][offsets[0] : offsets[-1]].tobytes()
+        rel = offsets - offsets[0]
+        return [buf[a:b] for a, b in zip(rel[:-1], rel[1:])]
+
+    def geometries(self, start, stop):
+        return shapely.from_wkb(self._slice("wkb", start, stop))
+
+    def properties(self, start, stop):
+        return [p.decode("utf-8") for p in self._slice("properties", start, stop)]
+
+    def take(self, indices):
+        """Geometries at arbitrary positions, read one by one from the map."""
+        offsets, data = self._offsets["wkb"], self._data["wkb"]
+        return shapely.from_wkb(
+            [data[offsets[i] : offsets[i + 1]].tobytes() for i in indices]
+        )
+
+    def column(self, name, chunk_size=CHUNK_SIZE):
+        """One property of every feature, decoded chunk by chunk."""
+        values = []
+        for start in range(0, len(self), chunk_size):
+            stop = min(start + chunk_size, len(self))
+            values.extend(json.loads(p).get(name) for p in self.properties(start, stop))
+        return values
+
+    def chunks(self, chunk_size=CHUNK_SIZE):
+        """Yield (geometries, property JSON strings) for consecutive chunks."""
+        for start in range(0, len(self), chunk_size):
+            stop = min(start + chunk_size, len(self))
+            yield self.geometries(start, stop), self.properties(start, stop)
+
+
+class GeometryBufferWriter:
+    """
+    Append geometries to a new buffer directory without holding them.
+
+    Use as a context manager; leaving it writes meta.json.
+    """
+
+    def __init__(self, path, crs=None):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.crs = CRS(crs) if crs is not None else None
+        self.count = 0
+        self._files, self._ends = {}, {}
+        for name in _ARRAYS:
+            self._files[name] = open(os.path.join(path, f"{name}.bin"), "wb")
+            self._files[f"{name}.offsets"] = open(
+                os.path.join(path, f"{name}.offsets"), "wb"
+            )
+            self._files[f"{name}.offsets"].write(np.zeros(1, "<i8").tobytes())
+            self._ends[name] = 0
+
+    def _append(self, name, items):
+        lengths = np.fromiter((len(item) for item in items), "<i8", len(items))
+        self._files[name].write(b"".join(items))
+        ends = self._ends[name] + np.cumsum(lengths, dtype="<i8")
+        self._files[f"{name}.offsets"].write(ends.tobytes())
+        if len(ends):
+            self._ends[name] = int(ends[-1])
+
+    def append(self, geometries, properties):
+        """
+        Append one chunk of features.
+
+        Args:
+            geometries (array-like): Shapely geometries
+            properties (list): One JSON object string per geometry
+        """
+        if len(geometries) != len(properties):
+            raise ValueError("Need one properties entry per geometry")
+        self._append("wkb", list(shapely.to_wkb(np.asarray(geometries))))
+        self._append("properties", [p.encode("utf-8") for p in properties])
+        self.count += len(geometries)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        meta = {
+            "count": self.count,
+            "crs": self.crs.to_wkt() if self.crs is not None else None,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _property_json(gdf):
+    """One JSON object string per row of a GeoDataFrame's attributes."""
+    props = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+    if props.columns.empty:
+        return ["{}"] * len(gdf)
+    text = props.to_json(orient="records", lines=True)
+    return text.split("\n")[: len(gdf)] if len(gdf) else []
+
+
+def combine_to_buffer(directory, path, schema=None, chunk_size=CHUNK_SIZE):
+    """
+    Combine every shapefile in a directory into one geometry buffer.
+
+    Files are read chunk_size rows at a time, so no whole state is ever
+    held in memory. Later files are reprojected to the first file's CRS.
+
+    Args:
+        directory (str): Directory containing shapefiles
+        path (str): Buffer directory to write
+        schema (dict): Optional property schema applied at read time
+        chunk_size (int): Features read per step
+
+    Returns:
+        GeometryBuffer: The combined buffer, or None if nothing was read
+    """
+    if not os.path.isdir(directory):
+        print(f"Directory not found: {directory}")
+        return None
+    shp_files = sorted(f for f in os.listdir(directory) if f.endswith(".shp"))
+
+    writer = None
+    for shp_file in shp_files:
+        shp_path = os.path.join(directory, shp_file)
+        start = 0
+        while True:
+            rows = slice(start, start + chunk_size)
+            try:
+                if schema:
+                    gdf = read_tracts(shp_path, schema, rows=rows)
+                else:
+                    gdf = gpd.read_file(shp_path, rows=rows)
+            except Exception as e:
+                print(f"Error reading {shp_path}: {e}")
+                break
+
+            if writer is None:
+                writer = GeometryBufferWriter(path, gdf.crs)
+            geometries = gdf.geometry.values
+            if writer.crs is not None and gdf.crs is not None and gdf.crs != writer.crs:
+                geometries = reproject(geometries, gdf.crs, writer.crs)
+            writer.append(np.asarray(geometries), _property_json(gdf))
+
+            if len(gdf) < chunk_size:
+                break
+            start += chunk_size
+
+    if writer is None:
+        print("No valid shapefiles could be read")
+        return None
+    writer.close()
+    return GeometryBuffer(path)
+
+
+def map_buffer(source, path, func, crs=None, chunk_size=CHUNK_SIZE):
+    """
+    Apply a vectorized geometry function chunk by chunk into a new buffer.
+
+    Args:
+        source (GeometryBuffer): Input buffer
+        path (str): Buffer directory to write
+        func (callable): Maps a geometry array to a geometry array
+        crs: CRS of func's output (defaults to the source CRS)
+        chunk_size (int): Features processed per step
+
+    Returns:
+        GeometryBuffer: The output buffer
+    """
+    with GeometryBufferWriter(path, crs or source.crs) as writer:
+        for geometries, properties in source.chunks(chunk_size):
+            writer.append(func(geometries), properties)
+    return GeometryBuffer(path)
+
+
+def repair_buffer(source, path, chunk_size=CHUNK_SIZE):
+    """Repair invalid geometries of a buffer into a new buffer."""
+    return map_buffer(source, path, repair_geometries, chunk_size=chunk_size)
+
+
+def simplify_buffer(source, path, tolerance, crs=None, chunk_size=CHUNK_SIZE):
+    """
+    Simplify a buffer's geometries into a new buffer.
+
+    With crs, each chunk is simplified in that projection (tolerance in its
+    units, REGIONAL for per-state regional CRSs) and written as WGS84, as in
+    simplify_geojson.
+    """
+    if not crs:
+
+        def simplify(geometries):
+            return shapely.simplify(geometries, tolerance, preserve_topology=True)
+
+        return map_buffer(source, path, simplify, chunk_size=chunk_size)
+
+    src_crs = source.crs or TIGER_CRS
+
+    if crs == REGIONAL:
+        with GeometryBufferWriter(path, WGS84) as writer:
+            for geometries, properties in source.chunks(chunk_size):
+                statefps = state_codes(
+                    pd.DataFrame.from_records([json.loads(p) for p in properties])
+                )
+                projected, partitions = to_regional(geometries, statefps, src_crs)
+                simplified = shapely.simplify(
+                    projected, tolerance, preserve_topology=True
+                )
+                writer.append(from_regional(simplified, partitions), properties)
+        return GeometryBuffer(path)
+
+    def simplify_projected(geometries):
+        projected = reproject(geometries, src_crs, crs)
+        simplified = shapely.simplify(projected, tolerance, preserve_topology=True)
+        return reproject(simplified, crs, WGS84)
+
+    return map_buffer(source, path, simplify_projected, WGS84, chunk_size)
+
+
+def build_buffer_adjacency(source, kind="queen", chunk_size=CHUNK_SIZE):
+    """
+    Contiguity graph of a buffer without loading all of its geometries.
+
+    Only the bounding boxes are held for the whole buffer; candidate pairs
+    from an STRtree of boxes are confirmed one chunk of geometries at a
+    time, fetching each chunk's candidate neighbours from the map.
+
+    Args:
+        source (GeometryBuffer): Unsimplified tract geometries
+        kind (str): "queen" or "rook"
+        chunk_size (int): Features processed per step
+
+    Returns:
+        sparse.csr_matrix: Same result as adjacency.build_adjacency
+    """
+    if kind not in ("queen", "rook"):
+        raise ValueError(f"Unknown contiguity kind: {kind}")
+
+    n = len(source)
+    bounds = np.empty((n, 4))
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        bounds[start:stop] = shapely.bounds(source.geometries(start, stop))
+    tree = shapely.STRtree(shapely.box(*bounds.T))
+
+    lefts, rights = [], []
+    for start in range(0, n, chunk_size):
+        geometries = source.geometries(start, min(start + chunk_size, n))
+        local, right = tree.query(geometries, predicate="intersects")
+        # Each pair is found from both sides; keep one copy and drop self-pairs
+        keep = local + start < right
+        local, right = local[keep], right[keep]
+        mine, theirs = geometries[local], source.take(right)
+        if kind == "queen":
+            found = shapely.intersects(mine, theirs)
+        else:
+            found = shares_edge(shapely.boundary(mine), shapely.boundary(theirs))
+        lefts.append(local[found] + start)
+        rights.append(right[found])
+
+    left = np.concatenate(lefts) if lefts else np.empty(0, dtype="int64")
+    right = np.concatenate(rights) if rights else np.empty(0, dtype="int64")
+    return pairs_to_adjacency(left, right, n)
+
+
+def write_geojson(source, output_path, chunk_size=CHUNK_SIZE):
+    """Stream a buffer out as a GeoJSON FeatureCollection, chunk by chunk."""
+    written = 0
+    with open(output_path, "w") as f:
+        f.write(_geojson_header(source.crs))
+        for geometries, properties in source.chunks(chunk_size):
+            for geometry, props in zip(shapely.to_geojson(geometries), properties):
+                f.write(",\n" if written else "")
+                f.write(
+                    '{"type": "Feature", "properties": '
+                    f'{props}, "geometry": {geometry or "null"}}}'
+                )
+                written += 1
+        f.write("\n]}\n")
+    return output_path
+
+
+def build_out_of_core(
+    directory,
+    output_path,
+    tolerance=0.01,
+    crs=None,
+    schema=None,
+    work_dir=None,
+    chunk_size=CHUNK_SIZE,
+    keep_buffers=False,
+):
+    """
+    Run combine -> repair -> simplify over memory-mapped geometry buffers.
+
+    Peak memory is bounded by chunk_size rather than the number of
+    features, so block groups or unsimplified national tracts can be built
+    on small machines. Each stage's buffer is deleted once the next one is
+    written unless keep_buffers is set.
+
+    Args:
+        directory (str): Directory containing shapefiles
+        output_path (str): Path to save the simplified GeoJSON
+        tolerance (float): Simplification tolerance
+        crs: Optional CRS to simplify in (see simplify_geojson)
+        schema (dict): Optional property schema applied at read time
+        work_dir (str): Directory for the buffers (defaults next to output)
+        chunk_size (int): Features processed per step
+        keep_buffers (bool): Keep intermediate buffers
+
+    Returns:
+        str: Path to the output file if successful, None otherwise
+    """
+    work_dir = work_dir or f"{output_path}.buffers"
+    stages = [os.path.join(work_dir, name) for name in ("combined", "repaired")]
+    try:
+        combined = combine_to_buffer(directory, stages[0], schema, chunk_size)
+        if combined is None:
+            return None
+        repaired = repair_buffer(combined, stages[1], chunk_size)
+        if not keep_buffers:
+            del combined
+            shutil.rmtree(stages[0])
+        simplified = simplify_buffer(
+            repaired, os.path.join(work_dir, "simplified"), tolerance, crs, chunk_size
+        )
+        if not keep_buffers:
+            del repaired
+            shutil.rmtree(stages[1])
+        write_geojson(simplified, output_path, chunk_size)
+        return output_path
+    except Exception as e:
+        print(f"Error in out-of-core build: {e}")
+        return None
+    finally:
+        if not keep_buffers and os.path.isdir(work_dir):
+            shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,335 @@
+import argparse
+import os
+import shutil
+import time
+from collections import namedtuple
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import partial
+
+from adjacency import (
+    load_adjacency,
+    neighborhood_stats,
+    read_adjacency,
+    save_adjacency,
+)
+from config import (
+    RAW_CSV_PATH,
+    PROCESSED_CSV_PATH,
+    SIMPLIFIED_JSON_PATH,
+    ACCESS_TOKEN_PATH,
+    CHOROPLETH_HTML_PATH,
+)
+from data_processing import process_acs_csv
+from fetch import fetch_inputs
+from geojson_utils import convert_to_geojson, extract_shapefiles, simplify_geojson
+from out_of_core import (
+    GeometryBuffer,
+    build_buffer_adjacency,
+    combine_to_buffer,
+    repair_buffer,
+    simplify_buffer,
+    write_geojson,
+)
+from projection import REGIONAL
+from validation import validate_acs_csv
+from visualization import generate_choropleth
+
+# A pipeline stage. func is called with no arguments (use functools.partial),
+# and executor is "thread" or "process".
+Task = namedtuple(
+    "Task", ["name", "func", "deps", "retries", "executor"], defaults=((), 0, "thread")
+)
+
+
+def plan(tasks):
+    """
+    Group tasks into waves that can run concurrently.
+
+    Args:
+        tasks (list): Task definitions
+
+    Returns:
+        list: Lists of task names; every task's dependencies are in an
+        earlier wave
+    """
+    graph = {task.name: task for task in tasks}
+    if len(graph) != len(tasks):
+        raise ValueError("Duplicate task names in pipeline")
+    for task in tasks:
+        unknown = set(task.deps) - set(graph)
+        if unknown:
+            raise ValueError(f"Task {task.name} depends on unknown tasks: {unknown}")
+
+    waves = []
+    placed = set()
+    while len(placed) < len(graph):
+        wave = sorted(
+            name
+            for name, task in graph.items()
+            if name not in placed and set(task.deps) <= placed
+        )
+        if not wave:
+            raise ValueError(f"Dependency cycle among: {sorted(set(graph) - placed)}")
+        waves.append(wave)
+        placed.update(wave)
+    return waves
+
+
+def _descendants(tasks, name):
+    """Names of every task that depends, directly or not, on name."""
+    found = set()
+    frontier = {name}
+    while frontier:
+        frontier = {t.name for t in tasks if set(t.deps) & frontier} - found
+        found |= frontier
+    return found
+
+
+def run_pipeline(tasks, max_workers=4, dry_run=False, retry_delay=1.0):
+    """
+    Run tasks as soon as their dependencies finish.
+
+    Independent branches run concurrently on a thread pool, or a process
+    pool for tasks with executor="process". A failing task is retried up to
+    its retries count; if it still fails, everything downstream of it is
+    skipped and a RuntimeError is raised once the rest has finished.
+
+    Args:
+        tasks (list): Task definitions
+        max_workers (int): Maximum tasks running at once per pool
+        dry_run (bool): Print the execution plan without running anything
+        retry_delay (float): Seconds to wait before retrying a task
+
+    Returns:
+        dict: Task name -> return value (the plan's waves when dry_run)
+    """
+    waves = plan(tasks)
+    if dry_run:
+        for i, wave in enumerate(waves, 1):
+            print(f"Wave {i}: {', '.join(wave)}")
+        return waves
+
+    graph = {task.name: task for task in tasks}
+    results, failed, skipped = {}, {}, set()
+    attempts = {name: 0 for name in graph}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers) as threads, ProcessPoolExecutor(
+        max_workers
+    ) as processes:
+        pools = {"thread": threads, "process": processes}
+
+        def submit(name):
+            attempts[name] += 1
+            task = graph[name]
+            running[pools[task.executor].submit(task.func)] = name
+            print(f"Started {name} (attempt {attempts[name]})")
+
+        while True:
+            busy = set(running.values())
+            for name in graph:
+                if (
+                    name not in results
+                    and name not in failed
+                    and name not in skipped
+                    and name not in busy
+                    and attempts[name] == 0
+                    and set(graph[name].deps) <= set(results)
+                ):
+                    submit(name)
+            if not running:
+                break
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                    print(f"Finished {name}")
+                except Exception as e:
+                    if attempts[name] <= graph[name].retries:
+                        print(f"Retrying {name} after error: {e}")
+                        time.sleep(retry_delay)
+                        submit(name)
+                    else:
+                        print(f"Failed {name}: {e}")
+                        failed[name] = e
+                        skipped |= _descendants(tasks, name)
+
+    if failed:
+        raise RuntimeError(
+            f"Pipeline failed at {sorted(failed)}; skipped {sorted(skipped)}"
+        )
+    return results
+
+
+def build_default_pipeline(
+    downloads=None,
+    column_mapping=None,
+    raw_csv=RAW_CSV_PATH,
+    processed_csv=PROCESSED_CSV_PATH,
+    simplified_json=SIMPLIFIED_JSON_PATH,
+    token_file=ACCESS_TOKEN_PATH,
+    output_html=CHOROPLETH_HTML_PATH,
+    tolerance=1000.0,
+    out_of_core=False,
+):
+    """
+    Declare the end-to-end pipeline as a task graph.
+
+    The ACS branch (acs_clean) and the geometry branch (shapefile_ingest ->
+    repair -> simplify) only meet at join, so they run in parallel. The
+    contiguity index is built from the repaired, unsimplified geometry
+    (simplifying each tract on its own breaks shared edges) alongside
+    simplify, and feeds the neighbourhood statistics stage.
+
+    Args:
+        downloads (dict): Optional URL -> path map for the fetch stage
+        column_mapping (dict): ACS column -> readable name; the first value
+            is the column mapped and analysed
+        raw_csv (str): Raw ACS CSV
+        processed_csv (str): Processed CSV output, keyed by 11-digit tract
+            GEOIDs to match the TIGER geometry
+        simplified_json (str): Simplified GeoJSON output
+        token_file (str): Mapbox access token file
+        output_html (str): Output HTML map
+        tolerance (float): Simplification tolerance in metres, measured in each
+            state's regional equal-area CRS
+        out_of_core (bool): Run repair, simplify and index over memory-mapped
+            geometry buffers instead of in-memory GeoDataFrames
+
+    Returns:
+        list: Task definitions for run_pipeline
+    """
+    column_mapping = column_mapping or {"S2701_C01_001E": "Total_Population"}
+    column = list(column_mapping.values())[0]
+    data_dir = os.path.dirname(raw_csv)
+    output_dir = os.path.dirname(processed_csv)
+    zip_dir = os.path.join(data_dir, "tractzips")
+    shp_dir = os.path.join(output_dir, "shapefiles")
+    combined_json = os.path.join(output_dir, "tracts1.geojson")
+    buffer_dir = os.path.join(output_dir, "buffers")
+    repaired_buffer = os.path.join(buffer_dir, "repaired")
+    adjacency_path = os.path.join(output_dir, "tract_adjacency.queen.npz")
+    report_path = os.path.join(output_dir, "validation_report.json")
+    stats_path = os.path.join(output_dir, "neighborhood_stats.csv")
+
+    def check(stage, result):
+        if result is None:
+            raise RuntimeError(f"{stage} produced no output")
+        return result
+
+    def ingest():
+        os.makedirs(shp_dir, exist_ok=True)
+        extract_shapefiles(zip_dir, shp_dir)
+
+    def repair():
+        if out_of_core:
+            combined = check(
+                "repair",
+                combine_to_buffer(shp_dir, os.path.join(buffer_dir, "combined")),
+            )
+            repair_buffer(combined, repaired_buffer)
+            shutil.rmtree(os.path.join(buffer_dir, "combined"))
+            return len(combined)
+        return check("repair", convert_to_geojson(shp_dir, combined_json, stream=True))
+
+    def simplify():
+        if out_of_core:
+            simplified = simplify_buffer(
+                GeometryBuffer(repaired_buffer),
+                os.path.join(buffer_dir, "simplified"),
+                tolerance,
+                crs=REGIONAL,
+            )
+            write_geojson(simplified, simplified_json)
+            shutil.rmtree(os.path.join(buffer_dir, "simplified"))
+            return simplified_json
+        return check(
+            "simplify",
+            simplify_geojson(combined_json, simplified_json, tolerance, crs=REGIONAL),
+        )
+
+    def index():
+        if out_of_core:
+            repaired = GeometryBuffer(repaired_buffer)
+            matrix = build_buffer_adjacency(repaired)
+            geoids = [str(geoid) for geoid in repaired.column("GEOID")]
+        else:
+            matrix, geoids = load_adjacency(combined_json)
+        save_adjacency(adjacency_path, matrix, geoids)
+        return adjacency_path
+
+    def join():
+        report = validate_acs_csv(
+            raw_csv, processed_csv, column_mapping, simplified_json, report_path
+        )
+        if not report["passed"]:
+            raise ValueError(f"Validation failed: {', '.join(report['errors'])}")
+        return report
+
+    def stats():
+        matrix, geoids, _ = read_adjacency(adjacency_path)
+        result = neighborhood_stats(
+            processed_csv, None, column, adjacency=(matrix, geoids)
+        )
+        result.to_csv(stats_path, index=False)
+        # Index and simplify have both finished with the repaired buffer
+        if out_of_core:
+            shutil.rmtree(buffer_dir, ignore_errors=True)
+        return stats_path
+
+    return [
+        Task("fetch", partial(fetch_inputs, downloads or {}), retries=2),
+        Task(
+            "acs_clean",
+            partial(
+                process_acs_csv,
+                raw_csv,
+                processed_csv,
+                column_mapping,
+                tract_geoids=True,
+            ),
+            deps=("fetch",),
+        ),
+        Task("shapefile_ingest", ingest, deps=("fetch",)),
+        Task("repair", repair, deps=("shapefile_ingest",)),
+        Task("simplify", simplify, deps=("repair",)),
+        Task("index", index, deps=("repair",)),
+        Task("join", join, deps=("acs_clean", "simplify")),
+        Task("stats", stats, deps=("index", "join")),
+        Task(
+            "render",
+            partial(
+                generate_choropleth,
+                processed_csv,
+                simplified_json,
+                token_file,
+                output_html,
+            ),
+            deps=("join",),
+        ),
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the choropleth pipeline")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--out-of-core",
+        action="store_true",
+        help="Process geometry chunk by chunk from memory-mapped buffers",
+    )
+    args = parser.parse_args()
+
+    run_pipeline(
+        build_default_pipeline(out_of_core=args.out_of_core),
+        args.workers,
+        dry_run=args.dry_run,
+    )
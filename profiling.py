@@ -0,0 +1,427 @@
+import argparse
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import tempfile
+import time
+import tracemalloc
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from shapely.geometry import Polygon, box
+
+from data_processing import process_csv
+from geojson_utils import convert_to_geojson
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json"
+)
+DEFAULT_SIZES = (1_000, 10_000, 50_000)
+
+
+def synthetic_acs_csv(path, rows, seed=0, geoids=None):
+    """
+    Write an ACS-shaped CSV: a description row under the header, GEO_IDs
+    with the 1400000US prefix, estimate and margin columns, and a few
+    sentinel values. Pass tract geoids (e.g. from synthetic_shapefiles) to
+    get rows that join to that geometry; rows is then ignored.
+    """
+    rng = np.random.default_rng(seed)
+    if geoids is None:
+        geoids = [
+            f"{state:02d}001{i:06d}"
+            for state, i in zip(rng.integers(1, 57, rows), range(rows))
+        ]
+    rows = len(geoids)
+    geoids = [f"1400000US{geoid}" for geoid in geoids]
+    estimates = rng.integers(0, 10_000, rows).astype(str)
+    estimates[rng.random(rows) < 0.01] = "-666666666"
+    df = pd.DataFrame(
+        {
+            "GEO_ID": ["Geography", *geoids],
+            "NAME": [
+                "Geographic Area Name",
+                *(f"Census Tract {i}" for i in range(rows)),
+            ],
+            "S2701_C01_001E": ["Estimate!!Total", *estimates],
+            "S2701_C01_001M": [
+                "Margin of Error!!Total",
+                *rng.integers(0, 500, rows).astype(str),
+            ],
+        }
+    )
+    df.to_csv(path, index=False)
+    return path
+
+
+def synthetic_shapefiles(directory, tracts, states=4, seed=0):
+    """
+    Write one tract shapefile per state with about tracts features in total.
+
+    Tracts are jittered grid cells with 40-vertex rings; one in fifty is a
+    self-intersecting bowtie so the repair step has work to do.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    per_state = max(1, tracts // states)
+    side = int(np.ceil(np.sqrt(per_state)))
+    t = np.linspace(0, 1, 10, endpoint=False)
+
+    for s in range(states):
+        statefp = f"{s + 1:02d}"
+        geometries, geoids = [], []
+        for i in range(per_state):
+            x0, y0 = s * (side + 1) + i % side, i // side
+            if i % 50 == 0:
+                geometries.append(
+                    Polygon([(x0, y0), (x0 + 1, y0 + 1), (x0 + 1, y0), (x0, y0 + 1)])
+                )
+            else:
+                # Densify the cell edges with a little noise
+                xs = np.concatenate(
+                    [x0 + t, np.full(10, x0 + 1), x0 + 1 - t, np.full(10, x0)]
+                )
+                ys = np.concatenate(
+                    [np.full(10, y0), y0 + t, np.full(10, y0 + 1), y0 + 1 - t]
+                )
+                jitter = rng.uniform(-0.01, 0.01, (2, 40))
+                ring = np.column_stack([xs + jitter[0], ys + jitter[1]])
+                geometries.append(
+                    Polygon(ring).intersection(box(x0, y0, x0 + 1, y0 + 1))
+                )
+            geoids.append(f"{statefp}001{i:06d}")
+        gdf = gpd.GeoDataFrame(
+            {"GEOID": geoids, "STATEFP": statefp}, geometry=geometries, crs="EPSG:4269"
+        )
+        gdf.to_file(os.path.join(directory, f"tl_2021_{statefp}_tract.shp"))
+    return directory
+
+
+# The implementations replaced when convert_to_geojson and process_csv were
+# unified, kept as they were so --compare can measure the change on the same
+# inputs. (The old geojson_utils.convert_to_geojson converted only the first
+# shapefile in a directory, so it does no comparable work and is left out.)
+
+
+def legacy_choropleth_process_csv(input_file, output_file, columns_to_keep):
+    """census_tract_choropleth.process_csv before unification."""
+    df = pd.read_csv(input_file)
+    df = df.drop(0)
+    df = df[columns_to_keep]
+    df.to_csv(output_file, index=False)
+
+
+def legacy_data_processing_process_csv(input_file, output_file, columns_to_keep):
+    """data_processing.process_csv before unification."""
+    df = pd.read_csv(input_file, dtype=str)
+    if len(df) > 0:
+        df = df.iloc[1:].copy()
+    df = df[columns_to_keep]
+    df.to_csv(output_file, index=False, quoting=1)
+
+
+def legacy_choropleth_convert_to_geojson(directory, output_path):
+    """census_tract_choropleth.convert_to_geojson (in memory) before unification."""
+    gdf_list = []
+    for shp_file in sorted(f for f in os.listdir(directory) if f.endswith(".shp")):
+        gdf = gpd.read_file(os.path.join(directory, shp_file))
+        gdf["geometry"] = gdf["geometry"].apply(
+            lambda geom: geom.buffer(0) if not geom.is_valid else geom
+        )
+        gdf_list.append(gdf)
+    combined_gdf = gpd.GeoDataFrame(pd.concat(gdf_list, ignore_index=True))
+    combined_gdf.to_file(output_path, driver="GeoJSON")
+    return output_path
+
+
+LEGACY_IMPLEMENTATIONS = {
+    "process_csv": [legacy_choropleth_process_csv, legacy_data_processing_process_csv],
+    "convert_to_geojson": [legacy_choropleth_convert_to_geojson],
+}
+
+
+def calibrate(repeats=5):
+    """
+    Best-of-repeats seconds for a fixed pandas/numpy workload (CSV round
+    trip and a sort). Benchmark times are stored relative to it, so a
+    baseline recorded on one machine can be checked on another.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "GEO_ID": rng.integers(0, 10**11, 100_000).astype(str),
+            "value": rng.random(100_000),
+        }
+    )
+    values = rng.random(1_000_000)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pd.read_csv(io.StringIO(df.to_csv(index=False)), dtype=str)
+        np.sort(values)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def profile_call(func, *args, top=10, **kwargs):
+    """
+    Measure one call three ways: wall time on its own, a cProfile run for
+    hotspots, and a tracemalloc run for peak Python allocations (each
+    instrument distorts the others, so they do not share a run).
+
+    Returns:
+        dict: seconds, peak_bytes, hotspots and the implementation called
+    """
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+
+    profiler = cProfile.Profile()
+    profiler.runcall(func, *args, **kwargs)
+    stats = pstats.Stats(profiler).sort_stats("cumulative")
+    hotspots = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        hotspots.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "calls": calls,
+                "tottime": round(tottime, 4),
+                "cumtime": round(cumtime, 4),
+            }
+        )
+    hotspots.sort(key=lambda h: h["cumtime"], reverse=True)
+
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "implementation": f"{func.__module__}.{func.__qualname__}",
+        "seconds": round(seconds, 4),
+        "peak_bytes": peak,
+        "hotspots": hotspots[:top],
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, workdir=None, top=10):
+    """
+    Profile the CSV and shapefile-combine stages on synthetic inputs.
+
+    Args:
+        sizes (iterable): Row / tract counts to generate
+        workdir (str): Scratch directory (a temporary one by default)
+        top (int): Hotspots kept per measurement
+
+    Each measurement also records relative_seconds (seconds over the
+    calibration run) and bytes_per_row, the machine-independent metrics
+    stored in the baseline.
+
+    Returns:
+        dict: {"environment": ..., "calibration_seconds": ...,
+        "results": {stage: {size: measurement}}}
+    """
+    calibration = calibrate()
+    results = {
+        "process_csv": {},
+        "convert_to_geojson": {},
+        "convert_to_geojson_stream": {},
+    }
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for size in sizes:
+            csv_path = synthetic_acs_csv(os.path.join(tmp, f"acs_{size}.csv"), size)
+            results["process_csv"][str(size)] = profile_call(
+                process_csv,
+                csv_path,
+                os.path.join(tmp, f"processed_{size}.csv"),
+                ["GEO_ID", "S2701_C01_001E"],
+                top=top,
+            )
+
+            shp_dir = synthetic_shapefiles(os.path.join(tmp, f"shp_{size}"), size)
+            for stage, stream in [
+                ("convert_to_geojson", False),
+                ("convert_to_geojson_stream", True),
+            ]:
+                results[stage][str(size)] = profile_call(
+                    convert_to_geojson,
+                    shp_dir,
+                    os.path.join(tmp, f"{stage}_{size}.geojson"),
+                    stream=stream,
+                    top=top,
+                )
+
+    for by_size in results.values():
+        for size, measurement in by_size.items():
+            measurement["relative_seconds"] = round(
+                measurement["seconds"] / calibration, 3
+            )
+            measurement["bytes_per_row"] = round(
+                measurement["peak_bytes"] / int(size), 1
+            )
+
+    environment = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "pandas": pd.__version__,
+        "geopandas": gpd.__version__,
+    }
+    return {
+        "environment": environment,
+        "calibration_seconds": round(calibration, 4),
+        "results": results,
+    }
+
+
+def baseline_metrics(report):
+    """
+    Keep only the normalized metrics of a run_benchmarks report.
+
+    Absolute times, hotspots and library versions describe one machine;
+    relative_seconds and bytes_per_row are what a baseline is checked on.
+    """
+    return {
+        "results": {
+            stage: {
+                size: {
+                    key: measurement[key]
+                    for key in ("implementation", "relative_seconds", "bytes_per_row")
+                }
+                for size, measurement in by_size.items()
+            }
+            for stage, by_size in report["results"].items()
+        }
+    }
+
+
+def compare_implementations(sizes=DEFAULT_SIZES, workdir=None):
+    """
+    Time the unified stages against the implementations they replaced.
+
+    Every implementation of a stage runs on the same synthetic input.
+
+    Args:
+        sizes (iterable): Row / tract counts to generate
+        workdir (str): Scratch directory (a temporary one by default)
+
+    Returns:
+        dict: {stage: {size: {implementation: {"seconds", "peak_bytes",
+        "relative_to_unified"}}}}; the unified implementation comes first
+    """
+    comparison = {stage: {} for stage in LEGACY_IMPLEMENTATIONS}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for size in sizes:
+            csv_path = synthetic_acs_csv(os.path.join(tmp, f"acs_{size}.csv"), size)
+            shp_dir = synthetic_shapefiles(os.path.join(tmp, f"shp_{size}"), size)
+            cases = [
+                ("process_csv", process_csv, csv_path, ".csv"),
+                ("convert_to_geojson", convert_to_geojson, shp_dir, ".geojson"),
+            ]
+            for stage, unified, source, suffix in cases:
+                extra = (["GEO_ID", "S2701_C01_001E"],) if suffix == ".csv" else ()
+                by_impl = {}
+                for func in [unified, *LEGACY_IMPLEMENTATIONS[stage]]:
+                    output = os.path.join(tmp, f"{func.__name__}_{size}{suffix}")
+                    m = profile_call(func, source, output, *extra, top=0)
+                    by_impl[m["implementation"]] = {
+                        "seconds": m["seconds"],
+                        "peak_bytes": m["peak_bytes"],
+                    }
+                unified_seconds = next(iter(by_impl.values()))["seconds"]
+                for m in by_impl.values():
+                    m["relative_to_unified"] = round(m["seconds"] / unified_seconds, 2)
+                comparison[stage][str(size)] = by_impl
+    return comparison
+
+
+def compare_to_baseline(current, baseline, slowdown=1.5):
+    """
+    List measurements that are slower or use more memory than the baseline.
+
+    Runs are compared on relative_seconds and bytes_per_row, so a baseline
+    from a faster or slower machine does not report false regressions.
+
+    Args:
+        current (dict): run_benchmarks output
+        baseline (dict): Stored baseline_metrics output
+        slowdown (float): Allowed ratio before a change counts as a regression
+
+    Returns:
+        list: Human-readable regression descriptions
+    """
+    regressions = []
+    for stage, by_size in current["results"].items():
+        for size, now in by_size.items():
+            before = baseline.get("results", {}).get(stage, {}).get(size)
+            if not before:
+                continue
+            for metric in ("relative_seconds", "bytes_per_row"):
+                if before[metric] and now[metric] > before[metric] * slowdown:
+                    regressions.append(
+                        f"{stage}[{size}] {metric}: "
+                        f"{before[metric]} -> {now[metric]}"
+                    )
+    return regressions
+
+
+def print_summary(report):
+    """Print one line per stage and size."""
+    for stage, by_size in report["results"].items():
+        for size, m in by_size.items():
+            print(
+                f"{stage:<28}{size:>8}  {m['seconds']:>8.3f}s  "
+                f"{m['peak_bytes'] / 1e6:>8.1f} MB  {m['implementation']}"
+            )
+
+
+def print_comparison(comparison):
+    """Print one line per stage, size and implementation."""
+    for stage, by_size in comparison.items():
+        for size, by_impl in by_size.items():
+            for implementation, m in by_impl.items():
+                print(
+                    f"{stage:<20}{size:>8}  {m['seconds']:>8.3f}s  "
+                    f"{m['peak_bytes'] / 1e6:>8.1f} MB  "
+                    f"{m['relative_to_unified']:>6.2f}x  {implementation}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile the build stages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--update", action="store_true", help="Store this run as the baseline"
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Time the pre-unification implementations against the unified ones",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        print_comparison(compare_implementations(args.sizes))
+    else:
+        report = run_benchmarks(args.sizes)
+        print_summary(report)
+
+        if args.update:
+            os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+            with open(args.baseline, "w") as f:
+                json.dump(baseline_metrics(report), f, indent=2)
+                f.write("\n")
+            print(f"Baseline saved to {args.baseline}")
+        elif os.path.exists(args.baseline):
+            with open(args.baseline, "r") as f:
+                regressions = compare_to_baseline(report, json.load(f))
+            for regression in regressions:
+                print(f"Regression: {regression}")
+            if regressions:
+                raise SystemExit(1)
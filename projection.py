@@ -0,0 +1,232 @@
+from functools import lru_cache
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import CRS, Transformer
+
+# Equal-area CRS covering all states and territories (WGS 84 / NSIDC
+# EASE-Grid 2.0 Global), used for tract areas and densities. Areas are true
+# everywhere, but as a cylindrical projection its scale is only true at
+# ±30°: a true 1 km measures about 1788 m east-west and 565 m north-south
+# at 61°N, so it is no place to measure distance tolerances.
+EQUAL_AREA_CRS = "EPSG:6933"
+WGS84 = "EPSG:4326"
+# TIGER/Line shapefiles are NAD83
+TIGER_CRS = "EPSG:4269"
+
+
+def _laea(lat, lon):
+    """Lambert azimuthal equal-area projection centred on lat, lon."""
+    return f"+proj=laea +lat_0={lat} +lon_0={lon} +datum=NAD83 +units=m +no_defs"
+
+
+# Regional equal-area CRSs that distance tolerances are measured in. Each
+# keeps scale within about 1% in every direction across its region, so a
+# tolerance in metres means the same thing in every state. States 01-56
+# without an entry use CONUS_CRS.
+CONUS_CRS = "EPSG:5070"  # NAD83 / Conus Albers
+REGIONAL_CRS = {
+    "02": "EPSG:3338",  # NAD83 / Alaska Albers
+    "15": "ESRI:102007",  # Hawaii Albers Equal Area Conic
+    "60": _laea(-14.3, -170.7),  # American Samoa
+    "66": _laea(13.45, 144.8),  # Guam
+    "69": _laea(17.0, 145.7),  # Northern Mariana Islands
+    "72": _laea(18.2, -66.5),  # Puerto Rico
+    "78": _laea(18.0, -64.8),  # U.S. Virgin Islands
+}
+# Pass as crs to simplify each state in its own regional CRS
+REGIONAL = "regional"
+
+
+@lru_cache(maxsize=32)
+def get_transformer(src_crs, dst_crs):
+    """Return a cached always-xy Transformer between two CRS definitions."""
+    return Transformer.from_crs(CRS(src_crs), CRS(dst_crs), always_xy=True)
+
+
+def units_per_degree(crs):
+    """
+    Units of crs spanned by one degree of latitude at the centre of its
+    area of use (1 for geographic CRSs; REGIONAL is measured in CONUS_CRS).
+
+    Used to rescale degree-based tolerances.
+    """
+    crs = CRS(CONUS_CRS if crs == REGIONAL else crs)
+    if crs.is_geographic:
+        return 1.0
+    if crs.area_of_use:
+        west, south, east, north = crs.area_of_use.bounds
+        # Areas crossing the antimeridian (Alaska) have east < west
+        east += 360 if east < west else 0
+        lon, lat = ((west + east) / 2 + 180) % 360 - 180, (south + north) / 2
+    else:
+        # Custom projections (e.g. _laea) are measured at their origin
+        params = {p.name: p.value for p in crs.coordinate_operation.params}
+        lon = params.get("Longitude of natural origin", 0.0)
+        lat = params.get("Latitude of natural origin", 0.0)
+    x, y = get_transformer(WGS84, str(crs)).transform(
+        [lon, lon], [lat - 0.5, lat + 0.5]
+    )
+    return float(np.hypot(x[1] - x[0], y[1] - y[0]))
+
+
+def regional_crs(statefp, geometries=None, src_crs=TIGER_CRS):
+    """
+    The regional equal-area CRS a state's tracts are measured in.
+
+    A code with no regional CRS gets an azimuthal equal-area projection
+    centred on its geometries.
+    """
+    statefp = str(statefp).zfill(2)
+    if statefp in REGIONAL_CRS:
+        return REGIONAL_CRS[statefp]
+    if statefp.isdigit() and 1 <= int(statefp) <= 56:
+        return CONUS_CRS
+    if geometries is None:
+        raise ValueError(f"No regional CRS for state {statefp}")
+    west, south, east, north = shapely.total_bounds(
+        reproject(geometries, src_crs, WGS84)
+    )
+    return _laea(round((south + north) / 2, 2), round((west + east) / 2, 2))
+
+
+def state_codes(df):
+    """Two-digit state FIPS code of each row, from STATEFP or the GEOID."""
+    if "STATEFP" in df.columns:
+        return df["STATEFP"].astype(str).str.zfill(2).to_numpy()
+    return df["GEOID"].astype(str).str[:2].to_numpy()
+
+
+def to_regional(geometries, statefps, src_crs=TIGER_CRS):
+    """
+    Reproject each state's geometries to its regional CRS.
+
+    Args:
+        geometries (array-like): Shapely geometries
+        statefps (array-like): State FIPS code of each geometry
+        src_crs: CRS of geometries
+
+    Returns:
+        tuple: (geometries in metres, {crs: row indices}) for from_regional
+    """
+    geometries = np.asarray(geometries)
+    statefps = np.asarray(statefps, dtype=str)
+    partitions = {}
+    for statefp in np.unique(statefps):
+        rows = np.flatnonzero(statefps == statefp)
+        crs = regional_crs(statefp, geometries[rows], src_crs)
+        partitions[crs] = np.concatenate(
+            [partitions.get(crs, np.empty(0, dtype="int64")), rows]
+        )
+
+    projected = np.empty(len(geometries), dtype=object)
+    for crs, rows in partitions.items():
+        projected[rows] = reproject(geometries[rows], src_crs, crs)
+    return projected, partitions
+
+
+def from_regional(geometries, partitions, dst_crs=WGS84):
+    """Reproject geometries from to_regional back to a single CRS."""
+    geometries = np.asarray(geometries)
+    out = np.empty(len(geometries), dtype=object)
+    for crs, rows in partitions.items():
+        out[rows] = reproject(geometries[rows], crs, dst_crs)
+    return out
+
+
+def reproject(geometries, src_crs, dst_crs, batch_size=50_000):
+    """
+    Reproject an array of geometries with vectorized coordinate transforms.
+
+    Each batch's coordinates are gathered into one array and transformed in
+    a single pyproj call rather than per feature.
+
+    Args:
+        geometries (array-like): Shapely geometries
+        src_crs: Source CRS (anything pyproj.CRS accepts)
+        dst_crs: Target CRS
+        batch_size (int): Geometries transformed per call
+
+    Returns:
+        np.ndarray: Reprojected geometries
+    """
+    geometries = np.asarray(geometries)
+    transformer = get_transformer(str(CRS(src_crs)), str(CRS(dst_crs)))
+
+    def transform(coords):
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y])
+
+    out = np.empty(len(geometries), dtype=object)
+    for start in range(0, len(geometries), batch_size):
+        batch = slice(start, start + batch_size)
+        out[batch] = shapely.transform(geometries[batch], transform)
+    return out
+
+
+def to_crs(gdf, crs, batch_size=50_000):
+    """Reproject a GeoDataFrame with reproject(); a missing CRS is TIGER's."""
+    src_crs = gdf.crs or TIGER_CRS
+    geometries = reproject(gdf.geometry.values, src_crs, crs, batch_size)
+    return gdf.set_geometry(gpd.GeoSeries(geometries, index=gdf.index, crs=crs))
+
+
+def to_equal_area(gdf, crs=EQUAL_AREA_CRS):
+    """Reproject tracts to the equal-area CRS used for areas and simplifying."""
+    return to_crs(gdf, crs)
+
+
+def to_wgs84(gdf):
+    """Reproject tracts back to WGS84 for rendering."""
+    return to_crs(gdf, WGS84)
+
+
+def add_density(df, gdf, columns, crs=EQUAL_AREA_CRS):
+    """
+    Add equal-area tract areas and per-km² density columns to a table.
+
+    Args:
+        df (pd.DataFrame): Table with a GEOID column
+        gdf (gpd.GeoDataFrame): Tract geometries with a GEOID column
+        columns (list): Count columns to turn into densities
+        crs: Equal-area CRS used to measure areas
+
+    Returns:
+        pd.DataFrame: df with Area_km2 and <column>_per_km2 columns
+    """
+    geometries = reproject(gdf.geometry.values, gdf.crs or TIGER_CRS, crs)
+    area = (
+        pd.Series(shapely.area(geometries) / 1e6, index=gdf["GEOID"].astype(str))
+        .groupby(level=0)
+        .sum()
+    )
+
+    out = df.copy()
+    out["Area_km2"] = out["GEOID"].astype(str).map(area)
+    for col in columns:
+        density = pd.to_numeric(out[col], errors="coerce") / out["Area_km2"]
+        out[f"{col}_per_km2"] = density.where(out["Area_km2"] > 0)
+    return out
+
+
+def density_csv(csv_file, json_file, output_file, columns):
+    """
+    Write the processed CSV with equal-area tract areas and densities.
+
+    Args:
+        csv_file (str): Processed CSV with a GEOID column
+        json_file (str): Tract GeoJSON
+        output_file (str): Path to save the CSV with density columns
+        columns (list): Count columns to turn into densities
+
+    Returns:
+        pd.DataFrame: The table that was written
+    """
+    df = pd.read_csv(csv_file, dtype={"GEOID": str})
+    gdf = gpd.read_file(json_file, columns=["GEOID"])
+    out = add_density(df, gdf, columns)
+    out.to_csv(output_file, index=False)
+    print(f"Density columns saved to {output_file}")
+    return out
@@ -0,0 +1,69 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import box
+from adjacency import (
+    build_adjacency,
+    load_adjacency,
+    spatial_lag,
+    neighborhood_stats,
+)
+
+
+@pytest.fixture
+def grid():
+    """A 3x3 grid of unit tracts; row-major, so the centre is index 4."""
+    cells = [box(x, y, x + 1, y + 1) for y in range(3) for x in range(3)]
+    geoids = [f"0100102010{i}" for i in range(9)]
+    return gpd.GeoDataFrame({"GEOID": geoids}, geometry=cells)
+
+
+def test_build_adjacency(grid):
+    """Test queen and rook contiguity on a regular grid."""
+    queen = build_adjacency(grid, "queen")
+    rook = build_adjacency(grid, "rook")
+
+    assert (queen != queen.T).nnz == 0
+    assert queen.diagonal().sum() == 0
+    assert queen[4].sum() == 8
+    assert rook[4].sum() == 4
+    assert queen[0].sum() == 3
+    assert rook[0].sum() == 2
+
+    with pytest.raises(ValueError):
+        build_adjacency(grid, "bishop")
+
+
+def test_spatial_lag_ignores_missing(grid):
+    """Test the lag averages only observed neighbours."""
+    rook = build_adjacency(grid, "rook")
+    values = np.arange(9, dtype="float64")
+    values[1] = np.nan
+    lag = spatial_lag(rook, values)
+    # Centre's rook neighbours are 1 (missing), 3, 5 and 7
+    assert lag[4] == pytest.approx(5.0)
+
+
+def test_neighborhood_stats_cached(grid, tmp_path):
+    """Test the graph is cached next to the geometry and reused."""
+    json_file = str(tmp_path / "tracts.geojson")
+    grid.to_file(json_file, driver="GeoJSON")
+    csv_file = tmp_path / "data.csv"
+    pd.DataFrame(
+        {"GEOID": grid["GEOID"], "Total_Population": [9, 9, 1, 9, 9, 1, 1, 1, 1]}
+    ).to_csv(csv_file, index=False)
+
+    stats = neighborhood_stats(csv_file, json_file, "Total_Population")
+    cache_path = f"{json_file}.queen.npz"
+    assert os.path.exists(cache_path)
+    assert stats["Total_Population_quadrant"].iloc[0] == "HH"
+    assert stats["Total_Population_quadrant"].iloc[8] == "LL"
+    assert stats["Total_Population_local_i"].iloc[0] > 0
+
+    mtime = os.path.getmtime(cache_path)
+    matrix, geoids = load_adjacency(json_file)
+    assert os.path.getmtime(cache_path) == mtime
+    assert list(geoids) == list(grid["GEOID"])
+    assert matrix[4].sum() == 8
@@ -0,0 +1,93 @@
+import os
+import pytest
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import box
+from areal_interpolation import (
+    build_areal_weights,
+    load_areal_weights,
+    interpolate_csv,
+)
+from crosswalk import reallocate_columns
+
+
+@pytest.fixture
+def layers():
+    """Two side-by-side tracts and two zones that straddle them."""
+    tracts = gpd.GeoDataFrame(
+        {"GEOID": ["01001020100", "01001020200"]},
+        geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1)],
+    )
+    targets = gpd.GeoDataFrame(
+        {"zone": ["west", "east"]},
+        geometry=[box(0, 0, 1.5, 1), box(1.5, 0, 2, 1)],
+    )
+    return tracts, targets
+
+
+def test_build_areal_weights(layers):
+    """Test that weights reflect intersection-area shares."""
+    tracts, targets = layers
+    weights = build_areal_weights(tracts, targets, "zone", batch_size=1)
+
+    assert weights.matrix.shape == (2, 2)
+    assert weights.matrix.toarray().tolist() == [[1.0, 0.5], [0.0, 0.5]]
+
+    df = pd.DataFrame({"GEOID": ["01001020100", "01001020200"], "Pop": [100, 40]})
+    counts = reallocate_columns(df, weights, ["Pop"])
+    assert counts["Pop"].tolist() == [120.0, 20.0]
+
+
+def test_load_areal_weights_cache(layers, tmp_path):
+    """Test that weights are cached and invalidated when either layer changes."""
+    tracts, targets = layers
+    cache_path = str(tmp_path / "zones.npz")
+
+    first = load_areal_weights(tracts, targets, "zone", cache_path)
+    assert os.path.exists(cache_path)
+    mtime = os.path.getmtime(cache_path)
+
+    cached = load_areal_weights(tracts, targets, "zone", cache_path)
+    assert os.path.getmtime(cache_path) == mtime
+    assert (cached.matrix != first.matrix).nnz == 0
+    assert list(cached.target_geoids) == ["west", "east"]
+
+    moved = targets.copy()
+    moved.geometry = [box(0, 0, 1, 1), box(1, 0, 2, 1)]
+    rebuilt = load_areal_weights(tracts, moved, "zone", cache_path)
+    assert rebuilt.matrix.toarray().tolist() == [[1.0, 0.0], [0.0, 1.0]]
+
+    # Same GEOIDs with repaired/reshaped geometry must not reuse the cache
+    reshaped = tracts.copy()
+    reshaped.geometry = [box(0, 0, 1.5, 1), box(1.5, 0, 2, 1)]
+    rebuilt = load_areal_weights(reshaped, targets, "zone", cache_path)
+    assert rebuilt.matrix.toarray().tolist() == [[1.0, 0.0], [0.0, 1.0]]
+
+
+def test_interpolate_csv(layers, tmp_path):
+    """Test the file-level interpolation stage."""
+    tracts, targets = layers
+    tracts_path = str(tmp_path / "tracts.geojson")
+    targets_path = str(tmp_path / "zones.geojson")
+    tracts.to_file(tracts_path, driver="GeoJSON")
+    targets.to_file(targets_path, driver="GeoJSON")
+
+    csv_file = tmp_path / "data.csv"
+    pd.DataFrame(
+        {"GEOID": ["01001020100", "01001020200"], "Total_Population": [100, 40]}
+    ).to_csv(csv_file, index=False)
+
+    output_file = tmp_path / "zones.csv"
+    interpolate_csv(
+        csv_file,
+        tracts_path,
+        targets_path,
+        "zone",
+        output_file,
+        ["Total_Population"],
+        cache_path=str(tmp_path / "zones.npz"),
+    )
+
+    result = pd.read_csv(output_file)
+    assert list(result.columns) == ["zone", "Total_Population"]
+    assert result["Total_Population"].tolist() == [120.0, 20.0]
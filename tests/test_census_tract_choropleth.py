@@ -4,6 +4,7 @@ import pandas as pd
 import geopandas as gpd
 from shapely.geometry import Polygon
 from census_tract_choropleth import convert_to_geojson, process_csv
+from geojson_utils import TRACT_SCHEMA
 
 
 @pytest.fixture
@@ -73,3 +74,63 @@ def test_process_csv(sample_csv, tmp_path):
     # Test with invalid columns
     with pytest.raises(KeyError):
         process_csv(sample_csv, output_path, ["NonExistentColumn"])
+
+
+def test_convert_to_geojson_stream(tmp_path):
+    """Test the streaming build matches the in-memory build."""
+    shp_dir = tmp_path / "states"
+    shp_dir.mkdir()
+    for i, statefp in enumerate(["01", "02"]):
+        gdf = gpd.GeoDataFrame(
+            {"GEOID": [f"{statefp}001020100", f"{statefp}001020200"]},
+            geometry=[
+                Polygon([(i, 0), (i + 1, 0), (i + 1, 1), (i, 1)]),
+                # Self-intersecting bowtie that must be repaired
+                Polygon([(i, 2), (i + 1, 3), (i + 1, 2), (i, 3)]),
+            ],
+            crs="EPSG:4269",
+        )
+        gdf.to_file(shp_dir / f"tl_2021_{statefp}_tract.shp")
+
+    streamed_path = str(tmp_path / "streamed.geojson")
+    combined_path = str(tmp_path / "combined.geojson")
+    assert convert_to_geojson(str(shp_dir), streamed_path, stream=True)
+    assert convert_to_geojson(str(shp_dir), combined_path)
+
+    streamed = gpd.read_file(streamed_path)
+    combined = gpd.read_file(combined_path)
+    assert streamed.crs == combined.crs
+    assert sorted(streamed["GEOID"]) == sorted(combined["GEOID"])
+    assert streamed.is_valid.all()
+
+    # Unreadable files only: no output is left behind
+    bad_dir = tmp_path / "bad"
+    bad_dir.mkdir()
+    (bad_dir / "broken.shp").write_text("not a shapefile")
+    bad_path = str(tmp_path / "bad.geojson")
+    assert convert_to_geojson(str(bad_dir), bad_path, stream=True) is None
+    assert not os.path.exists(bad_path)
+
+
+def test_convert_to_geojson_schema(tmp_path):
+    """Test that the schema stage prunes properties in the streaming build."""
+    shp_dir = tmp_path / "states"
+    shp_dir.mkdir()
+    gdf = gpd.GeoDataFrame(
+        {
+            "GEOID": ["01001020100"],
+            "STATEFP": ["01"],
+            "MTFCC": ["G5020"],
+            "ALAND": [104729834721],
+        },
+        geometry=[Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])],
+        crs="EPSG:4269",
+    )
+    gdf.to_file(shp_dir / "tl_2021_01_tract.shp")
+
+    output_path = str(tmp_path / "tracts.geojson")
+    convert_to_geojson(str(shp_dir), output_path, stream=True, schema=TRACT_SCHEMA)
+
+    result = gpd.read_file(output_path)
+    assert list(result.columns) == ["GEOID", "STATEFP", "ALAND", "geometry"]
+    assert result["ALAND"].iloc[0] == 104729834721
@@ -0,0 +1,101 @@
+import pytest
+import pandas as pd
+from crosswalk import (
+    read_tract_relationship,
+    build_crosswalk,
+    reallocate_columns,
+    reallocate_csv,
+)
+
+
+@pytest.fixture
+def relationship_file(tmp_path):
+    """Create a relationship file where one 2010 tract splits and two merge."""
+    rows = [
+        # 2010 tract 020100 splits 3:1 into 2020 tracts 020110 and 020120
+        ["01001020110", "01001020100", 300, 400, 0, 0, 300, 0],
+        ["01001020120", "01001020100", 100, 400, 0, 0, 100, 0],
+        # 2010 tracts 020201 and 020202 merge into 2020 tract 020300
+        ["01001020300", "01001020201", 500, 200, 0, 0, 200, 0],
+        ["01001020300", "01001020202", 500, 300, 0, 0, 300, 0],
+    ]
+    df = pd.DataFrame(
+        rows,
+        columns=[
+            "GEOID_TRACT_20",
+            "GEOID_TRACT_10",
+            "AREALAND_TRACT_20",
+            "AREALAND_TRACT_10",
+            "AREAWATER_TRACT_20",
+            "AREAWATER_TRACT_10",
+            "AREALAND_PART",
+            "AREAWATER_PART",
+        ],
+    )
+    df.insert(0, "OID_TRACT_20", range(len(df)))
+    path = tmp_path / "tab20_tract20_tract10_natl.txt"
+    df.to_csv(path, sep="|", index=False)
+    return str(path)
+
+
+def test_build_crosswalk(relationship_file):
+    """Test the weight matrix shape and that source weights sum to one."""
+    crosswalk = build_crosswalk(read_tract_relationship(relationship_file))
+
+    assert crosswalk.matrix.shape == (3, 3)
+    assert list(crosswalk.source_geoids) == [
+        "01001020100",
+        "01001020201",
+        "01001020202",
+    ]
+    assert list(crosswalk.target_geoids) == [
+        "01001020110",
+        "01001020120",
+        "01001020300",
+    ]
+    assert crosswalk.matrix.sum(axis=0).tolist() == [[1.0, 1.0, 1.0]]
+
+
+def test_reallocate_columns(relationship_file):
+    """Test count and rate reallocation between vintages."""
+    crosswalk = build_crosswalk(read_tract_relationship(relationship_file))
+    df = pd.DataFrame(
+        {
+            "GEOID": ["01001020100", "01001020201", "01001020202"],
+            "Total_Population": [400, 20, 30],
+        }
+    )
+
+    counts = reallocate_columns(df, crosswalk, ["Total_Population"])
+    assert counts["Total_Population"].tolist() == [300.0, 100.0, 50.0]
+    assert counts["Total_Population"].sum() == df["Total_Population"].sum()
+
+    rates = reallocate_columns(
+        pd.DataFrame(
+            {
+                "GEOID": ["01001020100", "01001020201", "01001020202"],
+                "Rate": [10.0, 20.0, 30.0],
+            }
+        ),
+        crosswalk,
+        ["Rate"],
+        intensive=True,
+    )
+    assert rates["Rate"].tolist() == pytest.approx([10.0, 10.0, 26.0])
+
+
+def test_reallocate_csv(relationship_file, tmp_path):
+    """Test the file-level reallocation stage."""
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    pd.DataFrame(
+        {"GEOID": ["01001020100", "01001020201"], "Total_Population": [400, 20]}
+    ).to_csv(input_file, index=False)
+
+    reallocate_csv(input_file, output_file, relationship_file, ["Total_Population"])
+
+    result = pd.read_csv(output_file)
+    assert result["Total_Population"].tolist() == [300.0, 100.0, 20.0]
+
+    with pytest.raises(ValueError):
+        build_crosswalk(read_tract_relationship(relationship_file), "10", "10")
@@ -139,3 +139,68 @@ def test_imports():
         import config
     except ImportError as e:
         pytest.fail(f"Failed to import project modules: {e}")
+
+
+def test_process_acs_csv_tract_geoids(tmp_path, column_mapping):
+    """Test full tract GEOIDs are kept to match TIGER features."""
+    input_file = tmp_path / "input.csv"
+    pd.DataFrame(
+        {
+            "GEO_ID": ["Geography", "1400000US01001020200", "1400000US01001020100"],
+            "S2701_C01_001E": ["Estimate!!Total", "2000", "1000"],
+            "S2701_C01_002E": ["Estimate!!Insured", "1600", "800"],
+        }
+    ).to_csv(input_file, index=False)
+    output_file = tmp_path / "output.csv"
+
+    process_acs_csv(input_file, output_file, column_mapping, tract_geoids=True)
+
+    processed_df = pd.read_csv(output_file, dtype={"GEOID": str})
+    assert processed_df["GEOID"].tolist() == ["01001020100", "01001020200"]
+    assert processed_df["Total_Population"].tolist() == [1000.0, 2000.0]
+
+
+def test_process_acs_csv_blanks_sentinels(tmp_path, column_mapping):
+    """Test ACS sentinel estimates become missing values, not numbers."""
+    input_file = tmp_path / "input.csv"
+    pd.DataFrame(
+        {
+            "GEO_ID": ["1400000US01001020100", "1400000US01001020200"],
+            "S2701_C01_001E": ["-666666666", "2000"],
+            "S2701_C01_002E": ["800", "-999999999"],
+        }
+    ).to_csv(input_file, index=False)
+    output_file = tmp_path / "output.csv"
+
+    process_acs_csv(input_file, output_file, column_mapping, tract_geoids=True)
+
+    processed_df = pd.read_csv(output_file, dtype={"GEOID": str})
+    assert processed_df["Total_Population"].isna().tolist() == [True, False]
+    assert processed_df.iloc[:, 2].isna().tolist() == [False, True]
+
+
+def test_process_acs_csv_byte_identical(tmp_path, column_mapping):
+    """Test repeated runs write byte-identical, fixed-point output."""
+    raw = pd.DataFrame(
+        {
+            "GEO_ID": ["1400000US01001020200", "1400000US01001020100"],
+            "S2701_C01_001E": ["2000", "1000.5"],
+            "S2701_C01_002E": ["1600", "800"],
+        }
+    )
+    input_file = tmp_path / "input.csv"
+    raw.to_csv(input_file, index=False)
+    shuffled_file = tmp_path / "shuffled.csv"
+    raw.iloc[::-1].to_csv(shuffled_file, index=False)
+
+    outputs = []
+    for i, source in enumerate([input_file, input_file, shuffled_file]):
+        output_file = tmp_path / f"output{i}.csv"
+        process_acs_csv(source, output_file, column_mapping, tract_geoids=True)
+        outputs.append(output_file.read_bytes())
+
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert outputs[0].decode().splitlines()[1:] == [
+        "01001020100,1000.500000,800.000000",
+        "01001020200,2000.000000,1600.000000",
+    ]
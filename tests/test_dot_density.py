@@ -0,0 +1,71 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from shapely.geometry import Point, Polygon, box
+from dot_density import sample_points, generate_dot_density, read_dot_density
+
+
+def test_sample_points_inside():
+    """Test every sampled point falls inside its own polygon."""
+    ring = Point(0, 0).buffer(2).difference(Point(0, 0).buffer(1.5))
+    geoms = np.array([ring, box(5, 5, 6, 6)], dtype=object)
+    x, y, owner = sample_points(geoms, [500, 20], np.random.default_rng(1))
+
+    assert np.bincount(owner).tolist() == [500, 20]
+    assert shapely.contains_xy(geoms[owner], x, y).all()
+
+
+def test_sample_points_warns_on_degenerate_geometry():
+    """Test tracts that cannot hold their dots are reported, not dropped."""
+    flat = Polygon([(0, 0), (1, 0), (2, 0)])
+    geoms = np.array([box(0, 0, 1, 1), flat, None], dtype=object)
+    with pytest.warns(UserWarning, match=r"12 points not placed.*\{1: 5, 2: 7\}"):
+        x, y, owner = sample_points(
+            geoms, [10, 5, 7], np.random.default_rng(0), max_rounds=5
+        )
+    assert np.bincount(owner, minlength=3).tolist() == [10, 0, 0]
+
+
+def test_generate_dot_density(tmp_path):
+    """Test the binary point file, its metadata and reproducibility."""
+    gdf = gpd.GeoDataFrame(
+        {"GEOID": ["01001020100", "06001400100"]},
+        geometry=[box(0, 0, 1, 1), box(2, 0, 3, 1)],
+        crs="EPSG:4326",
+    )
+    json_file = str(tmp_path / "tracts.geojson")
+    gdf.to_file(json_file, driver="GeoJSON")
+    csv_file = tmp_path / "data.csv"
+    pd.DataFrame(
+        {
+            "GEOID": ["01001020100", "06001400100"],
+            "Insured_Population": [1000, 40],
+            "Uninsured_Population": [100, 0],
+        }
+    ).to_csv(csv_file, index=False)
+
+    output_path = str(tmp_path / "dots.bin")
+    columns = ["Insured_Population", "Uninsured_Population"]
+    metadata = generate_dot_density(
+        csv_file, json_file, output_path, columns, people_per_dot=10, workers=2
+    )
+
+    points = read_dot_density(output_path)
+    assert metadata["count"] == len(points) == 100 + 10 + 4
+    assert metadata["record_bytes"] == 9
+    assert metadata["missing"] == 0
+    assert (tmp_path / "dots.bin").stat().st_size == 9 * len(points)
+    assert np.bincount(points["category"]).tolist() == [104, 10]
+    assert json.loads((tmp_path / "dots.bin.json").read_text()) == metadata
+
+    california = points[points["x"] >= 2]
+    assert len(california) == 4
+    assert (california["category"] == 0).all()
+
+    generate_dot_density(
+        csv_file, json_file, output_path, columns, people_per_dot=10, workers=2
+    )
+    assert np.array_equal(read_dot_density(output_path), points)
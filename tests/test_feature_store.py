@@ -0,0 +1,89 @@
+import json
+import os
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import box
+from feature_store import FeatureStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A store over three tracts written out of GEOID order."""
+    gdf = gpd.GeoDataFrame(
+        {"GEOID": ["01001020300", "01001020100", "01001020200"]},
+        geometry=[box(2, 0, 3, 1), box(0, 0, 1, 1), box(1, 0, 2, 1)],
+        crs="EPSG:4326",
+    )
+    json_file = str(tmp_path / "tracts.geojson")
+    gdf.to_file(json_file, driver="GeoJSON")
+    return FeatureStore.create(str(tmp_path / "store"), json_file)
+
+
+def test_create_aligns_features(store):
+    """Test rows are sorted by GEOID and point at their features."""
+    assert list(store.geoids) == ["01001020100", "01001020200", "01001020300"]
+    assert list(store.features) == [1, 2, 0]
+
+    features = store.geojson()["features"]
+    assert [f["id"] for f in features] == list(store.geoids)
+    assert [f["properties"]["GEOID"] for f in features] == list(store.geoids)
+
+
+def test_update_writes_one_column_in_place(store, tmp_path):
+    """Test updating a column leaves the other column files untouched."""
+    csv_file = tmp_path / "data.csv"
+    pd.DataFrame(
+        {
+            "GEOID": ["01001020300", "01001020100", "06001400100"],
+            "Total_Population": [30, 10, 99],
+            "County": ["Autauga", "Autauga", "Alameda"],
+        }
+    ).to_csv(csv_file, index=False)
+    assert store.update_csv(csv_file) == ["Total_Population", "County"]
+
+    population = store.column("Total_Population")
+    assert np.isnan(population[1])
+    assert list(population[[0, 2]]) == [10, 30]
+    assert list(store.column("County")) == ["Autauga", "", "Autauga"]
+
+    county_path = os.path.join(store.path, "columns", "County.npy")
+    county_mtime = os.stat(county_path).st_mtime_ns
+    store.write_column(
+        "Total_Population", [11, 21], geoids=["01001020100", "01001020200"]
+    )
+    assert list(store.column("Total_Population")[:2]) == [11, 21]
+    assert np.isnan(store.column("Total_Population")[2])
+    assert os.stat(county_path).st_mtime_ns == county_mtime
+
+    reopened = FeatureStore(store.path)
+    assert reopened.columns == ["Total_Population", "County"]
+    assert reopened.to_frame()["County"].iloc[2] == "Autauga"
+
+    with pytest.raises(ValueError):
+        store.write_column("Total_Population", [1, 2])
+    with pytest.raises(KeyError):
+        store.column("Median_Income")
+
+
+def test_figure_uses_feature_ids(store):
+    """Test the map is drawn from the aligned column without a join key."""
+    store.write_column("Total_Population", [10, 20, 30])
+    fig = store.figure("Total_Population")
+    trace = fig.data[0]
+    assert trace.featureidkey == "id"
+    assert list(trace.locations) == list(store.geoids)
+    assert list(trace.z) == [10, 20, 30]
+
+
+def test_geometry_change_detected(store):
+    """Test a store refuses to render over a different geometry file."""
+    with open(store.meta["geometry"], "r") as f:
+        geojson_data = json.load(f)
+    geojson_data["features"].pop()
+    with open(store.meta["geometry"], "w") as f:
+        json.dump(geojson_data, f)
+
+    with pytest.raises(ValueError, match="Geometry changed"):
+        FeatureStore(store.path).geojson()
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from fetch import fetch_inputs, tiger_tract_downloads
+
+
+@pytest.fixture
+def census_server():
+    """Local stand-in for the Census download server with ETag support."""
+    files = {
+        "/tl_2021_01_tract.zip": b"alabama tracts",
+        "/tl_2021_02_tract.zip": b"alaska tracts",
+        "/acs.csv": b"GEO_ID,S2701_C01_001E\n",
+    }
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            requests.append(self.path)
+            if self.path == "/moved.csv":
+                self.send_response(302)
+                # Lower-case names, as some servers and proxies send them
+                self.send_header("location", "/acs.csv")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = files.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("etag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    yield {"base": base, "files": files, "requests": requests}
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_inputs_cache(census_server, tmp_path):
+    """Test concurrent download, ETag revalidation and checksum repair."""
+    base = census_server["base"]
+    downloads = {
+        f"{base}/tl_2021_01_tract.zip": str(tmp_path / "tractzips" / "01.zip"),
+        f"{base}/tl_2021_02_tract.zip": str(tmp_path / "tractzips" / "02.zip"),
+        f"{base}/moved.csv": str(tmp_path / "acs.csv"),
+    }
+
+    results = fetch_inputs(downloads, concurrency=2)
+    assert set(results.values()) == {"downloaded"}
+    assert (tmp_path / "acs.csv").read_bytes() == census_server["files"]["/acs.csv"]
+
+    # Unchanged files are revalidated, not downloaded again
+    results = fetch_inputs(downloads, concurrency=2)
+    assert set(results.values()) == {"cached"}
+
+    # A corrupted local copy and a changed remote file are both refetched
+    (tmp_path / "tractzips" / "01.zip").write_bytes(b"truncated")
+    census_server["files"]["/tl_2021_02_tract.zip"] = b"alaska tracts v2"
+    results = fetch_inputs(downloads, concurrency=2)
+    assert results[f"{base}/tl_2021_01_tract.zip"] == "downloaded"
+    assert results[f"{base}/tl_2021_02_tract.zip"] == "downloaded"
+    assert results[f"{base}/moved.csv"] == "cached"
+    assert (tmp_path / "tractzips" / "02.zip").read_bytes() == b"alaska tracts v2"
+
+
+def test_fetch_inputs_errors(census_server, tmp_path):
+    """Test missing files and checksum mismatches are reported."""
+    base = census_server["base"]
+    with pytest.raises(IOError, match="1 of 1 downloads failed"):
+        fetch_inputs({f"{base}/missing.zip": str(tmp_path / "missing.zip")})
+
+    with pytest.raises(IOError):
+        fetch_inputs(
+            {f"{base}/acs.csv": str(tmp_path / "acs.csv")},
+            checksums={f"{base}/acs.csv": "0" * 64},
+        )
+    assert not os.path.exists(tmp_path / "acs.csv")
+
+
+def test_tiger_tract_downloads(tmp_path):
+    """Test TIGER URLs cover all 56 state and territory zips."""
+    downloads = tiger_tract_downloads(str(tmp_path), year=2021)
+    assert len(downloads) == 56
+    url = "https://www2.census.gov/geo/tiger/TIGER2021/TRACT/tl_2021_06_tract.zip"
+    assert downloads[url] == os.path.join(str(tmp_path), "tl_2021_06_tract.zip")
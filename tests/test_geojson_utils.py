@@ -1,9 +1,19 @@
 import os
 import pytest
 import geopandas as gpd
+import shapely
 import zipfile
-from shapely.geometry import Polygon
-from geojson_utils import extract_shapefiles, simplify_geojson, convert_to_geojson
+from shapely.geometry import Point, Polygon
+from geojson_utils import (
+    extract_shapefiles,
+    simplify_geojson,
+    simplify_parallel,
+    convert_to_geojson,
+    read_tracts,
+    reduce_precision,
+    simplify_to_budget,
+    TRACT_SCHEMA,
+)
 
 
 @pytest.fixture
@@ -82,3 +92,91 @@ def test_convert_to_geojson(sample_shapefile, tmp_path):
     # Test with invalid directory
     result = convert_to_geojson("/nonexistent/dir", output_path)
     assert result is None
+
+
+@pytest.mark.parametrize("partition", ["state", "spatial"])
+def test_simplify_parallel(tmp_path, partition):
+    """Test that parallel simplification matches the serial result in order."""
+    circles = [Point(x, y).buffer(0.4) for x, y in [(0, 0), (5, 0), (1, 3), (6, 2)]]
+    gdf = gpd.GeoDataFrame(
+        {"GEOID": ["06001", "01001", "06002", "01002"]}, geometry=circles
+    )
+
+    serial = gdf.geometry.simplify(0.05, preserve_topology=True)
+    parallel = simplify_parallel(gdf, 0.05, workers=2, partition=partition)
+
+    assert list(parallel.index) == list(gdf.index)
+    assert all(a.equals_exact(b, 0) for a, b in zip(parallel, serial))
+
+    input_path = str(tmp_path / "input.geojson")
+    output_path = str(tmp_path / "simplified.geojson")
+    gdf.to_file(input_path, driver="GeoJSON")
+    assert simplify_geojson(input_path, output_path, 0.05, workers=2) == output_path
+    assert list(gpd.read_file(output_path)["GEOID"]) == list(gdf["GEOID"])
+
+
+def test_read_tracts_schema(tmp_path):
+    """Test that unused TIGER properties are dropped and dtypes compacted."""
+    gdf = gpd.GeoDataFrame(
+        {
+            "STATEFP": ["01", "01"],
+            "COUNTYFP": ["001", "003"],
+            "GEOID": ["01001020100", "01003010200"],
+            "MTFCC": ["G5020", "G5020"],
+            "ALAND": [9825303, 104729834721],
+            "INTPTLAT": ["+32.4771", "+30.6590"],
+        },
+        geometry=[Point(0, 0).buffer(1), Point(3, 0).buffer(1)],
+        crs="EPSG:4269",
+    )
+    input_path = str(tmp_path / "tracts.geojson")
+    gdf.to_file(input_path, driver="GeoJSON")
+
+    tracts = read_tracts(input_path)
+    assert list(tracts.columns) == ["GEOID", "STATEFP", "COUNTYFP", "ALAND", "geometry"]
+    assert tracts["STATEFP"].dtype == "category"
+    assert tracts["ALAND"].dtype == "int64"
+    assert tracts["ALAND"].tolist() == [9825303, 104729834721]
+    assert tracts["GEOID"].tolist() == ["01001020100", "01003010200"]
+
+    output_path = str(tmp_path / "simplified.geojson")
+    simplify_geojson(input_path, output_path, schema=TRACT_SCHEMA)
+    assert "MTFCC" not in gpd.read_file(output_path).columns
+
+
+def test_reduce_precision_and_budget(tmp_path):
+    """Test grid snapping and simplifying to a vertex budget."""
+    circles = [Point(-86.123456789, 32.0 + i).buffer(0.3, 64) for i in range(3)]
+    gdf = gpd.GeoDataFrame(
+        {"GEOID": ["01001", "01002", "01003"]}, geometry=circles, crs="EPSG:4326"
+    )
+
+    snapped = reduce_precision(gdf.geometry.values, 1e-5)
+    assert all(g.is_valid for g in snapped)
+    assert shapely.get_coordinates(snapped)[:, 0].round(5).tolist() == (
+        shapely.get_coordinates(snapped)[:, 0].tolist()
+    )
+
+    simplified, tolerances = simplify_to_budget(
+        gdf.geometry.values, max_vertices=60, max_feature_vertices=15
+    )
+    counts = shapely.get_num_coordinates(simplified)
+    assert counts.sum() <= 60
+    assert counts.max() <= 15
+    assert (tolerances > 0).all()
+
+    input_path = str(tmp_path / "input.geojson")
+    output_path = str(tmp_path / "budget.geojson")
+    gdf.to_file(input_path, driver="GeoJSON")
+    result = simplify_geojson(input_path, output_path, max_bytes=2000, grid_size=1e-5)
+    assert result == output_path
+    written = gpd.read_file(output_path)
+    assert sum(len(shapely.to_geojson(g)) for g in written.geometry) <= 2000
+    assert "-86.1234567" not in open(output_path).read()
+
+    # An unreachable budget fails instead of writing an over-budget file
+    with pytest.raises(ValueError, match="Budget not met"):
+        simplify_to_budget(gdf.geometry.values, max_vertices=3)
+    unreachable_path = str(tmp_path / "unreachable.geojson")
+    assert simplify_geojson(input_path, unreachable_path, max_vertices=3) is None
+    assert not os.path.exists(unreachable_path)
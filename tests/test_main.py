@@ -111,6 +111,28 @@ def test_main_success(mock_environment):
         pytest.fail(f"Main function failed: {str(e)}")
 
 
+def test_main_deterministic_outputs(mock_environment):
+    """Test identical inputs give identical bytes and manifest."""
+    output_dir = mock_environment["output_dir"]
+
+    main()
+    first_html = (output_dir / "Blog_choropleth_map_FINAL.html").read_bytes()
+    first_manifest = json.loads((output_dir / "manifest.json").read_text())
+
+    main()
+    second_html = (output_dir / "Blog_choropleth_map_FINAL.html").read_bytes()
+    second_manifest = json.loads((output_dir / "manifest.json").read_text())
+
+    assert first_html == second_html
+    assert first_manifest == second_manifest
+    assert sorted(first_manifest["artifacts"]) == [
+        "Blog_Data.csv",
+        "Blog_choropleth_map_FINAL.html",
+        "blog_tracts_zip.json",
+        "validation_report.json",
+    ]
+
+
 def test_main_invalid_acs_data(mock_environment):
     """Test main function with invalid ACS data."""
     # Corrupt the ACS data file
@@ -121,6 +143,24 @@ def test_main_invalid_acs_data(mock_environment):
         main()
 
 
+def test_main_duplicate_geoids(mock_environment):
+    """Test main function stops when validation finds duplicate GEOIDs."""
+    acs_data = pd.DataFrame(
+        {
+            "GEO_ID": ["1400000US01001", "1400000US01001"],
+            "S2701_C01_001E": ["1000", "2000"],
+        }
+    )
+    acs_data.to_csv(mock_environment["acs_file"], index=False)
+
+    with pytest.raises(SystemExit):
+        main()
+
+    report_path = mock_environment["output_dir"] / "validation_report.json"
+    report = json.loads(report_path.read_text())
+    assert report["errors"] == ["duplicate_geoids"]
+
+
 def test_main_invalid_token(mock_environment):
     """Test main function with invalid Mapbox token."""
     # Remove token file
@@ -0,0 +1,32 @@
+import json
+from manifest import build_manifest, write_manifest, changed_artifacts
+
+
+def test_write_manifest(tmp_path):
+    """Test manifests hash every artifact and skip missing files."""
+    csv_path = tmp_path / "Blog_Data.csv"
+    csv_path.write_text("GEOID,Total_Population\n01001,1000.0\n")
+    manifest_path = tmp_path / "manifest.json"
+
+    manifest = write_manifest(
+        [str(csv_path), str(tmp_path / "missing.html")], str(manifest_path)
+    )
+
+    assert json.loads(manifest_path.read_text()) == manifest
+    assert list(manifest["artifacts"]) == ["Blog_Data.csv"]
+    assert manifest["artifacts"]["Blog_Data.csv"]["bytes"] == csv_path.stat().st_size
+
+
+def test_changed_artifacts(tmp_path):
+    """Test only artifacts with new content are reported as changed."""
+    a = tmp_path / "a.csv"
+    b = tmp_path / "b.html"
+    a.write_text("same")
+    b.write_text("old")
+    old = build_manifest([str(a), str(b)])
+
+    b.write_text("new")
+    new = build_manifest([str(a), str(b)])
+
+    assert changed_artifacts(old, new) == ["b.html"]
+    assert changed_artifacts({}, new) == ["a.csv", "b.html"]
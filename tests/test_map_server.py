@@ -0,0 +1,84 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+import pandas as pd
+from map_server import make_server, classify
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Start a map server on a free port with two states of tracts."""
+    geoids = ["01001020100", "01001020200", "06001400100"]
+    df = pd.DataFrame({"GEOID": geoids, "Total_Population": [1000, 2000, 3000]})
+    csv_path = tmp_path / "data.csv"
+    df.to_csv(csv_path, index=False)
+
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"GEOID": geoid},
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[i, 0], [i + 1, 0], [i + 1, 1], [i, 1], [i, 0]]],
+            },
+        }
+        for i, geoid in enumerate(geoids)
+    ]
+    json_path = tmp_path / "tracts.json"
+    json_path.write_text(
+        json.dumps({"type": "FeatureCollection", "features": features})
+    )
+
+    server = make_server(str(csv_path), str(json_path), None, port=0, cache_size=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path):
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    with urllib.request.urlopen(url) as response:
+        return response.status, response.read().decode("utf-8")
+
+
+def test_map_server_renders_and_caches(server):
+    """Test on-demand regional rendering and the response cache."""
+    status, html = _get(server, "/map?column=Total_Population&region=01")
+    assert status == 200
+    assert "01001020100" in html
+    assert "06001400100" not in html
+
+    _get(server, "/map?column=Total_Population&region=01")
+    info = server.render.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+
+    status, _ = _get(server, "/map?column=Total_Population&scheme=quantile&classes=3")
+    assert status == 200
+
+
+def test_map_server_errors(server):
+    """Test error statuses for bad parameters."""
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _get(server, "/map?column=Nope")
+    assert e.value.code == 400
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _get(server, "/map?region=99")
+    assert e.value.code == 404
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _get(server, "/map?scheme=jenks")
+    assert e.value.code == 400
+
+
+def test_classify():
+    """Test classification schemes."""
+    values = pd.Series([1.0, 2.0, 3.0, 4.0])
+    binned, range_color = classify(values, "equal", 2)
+    assert binned.tolist() == [0, 0, 1, 1]
+    assert range_color == (0, 1)
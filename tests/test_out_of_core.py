@@ -0,0 +1,150 @@
+import os
+import pytest
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.geometry import Point, Polygon, box
+from adjacency import build_adjacency
+from projection import REGIONAL
+from geojson_utils import TRACT_SCHEMA, convert_to_geojson, simplify_geojson
+from out_of_core import (
+    GeometryBuffer,
+    GeometryBufferWriter,
+    combine_to_buffer,
+    build_buffer_adjacency,
+    build_out_of_core,
+)
+
+
+@pytest.fixture
+def shp_dir(tmp_path):
+    """Two states of seven tracts each, including one bowtie per state."""
+    directory = tmp_path / "states"
+    directory.mkdir()
+    for s, statefp in enumerate(["01", "02"]):
+        geometries = [Point(s * 10 + i, 0).buffer(0.4) for i in range(6)]
+        geometries.append(
+            Polygon([(s * 10, 2), (s * 10 + 1, 3), (s * 10 + 1, 2), (s * 10, 3)])
+        )
+        gdf = gpd.GeoDataFrame(
+            {
+                "GEOID": [f"{statefp}001{i:06d}" for i in range(7)],
+                "STATEFP": statefp,
+                "MTFCC": "G5020",
+            },
+            geometry=geometries,
+            crs="EPSG:4269",
+        )
+        gdf.to_file(directory / f"tl_2021_{statefp}_tract.shp")
+    return str(directory)
+
+
+def test_buffer_round_trip(tmp_path):
+    """Test ragged WKB and property arrays read back chunk by chunk."""
+    geometries = [Point(i, i).buffer(1) for i in range(5)] + [Point(0, 0)]
+    path = str(tmp_path / "buffer")
+    with GeometryBufferWriter(path, "EPSG:4269") as writer:
+        writer.append(geometries[:4], ['{"i": 0}', '{"i": 1}', '{"i": 2}', "{}"])
+        writer.append(geometries[4:], ['{"i": 4}', '{"i": "\\u00e9"}'])
+
+    buffer = GeometryBuffer(path)
+    assert len(buffer) == 6
+    assert buffer.crs.to_epsg() == 4269
+    assert isinstance(buffer._data["wkb"], np.memmap)
+    chunks = list(buffer.chunks(4))
+    assert [len(g) for g, _ in chunks] == [4, 2]
+    assert shapely.equals(np.concatenate([g for g, _ in chunks]), geometries).all()
+    assert chunks[1][1] == ['{"i": 4}', '{"i": "\\u00e9"}']
+
+    with pytest.raises(ValueError):
+        GeometryBufferWriter(str(tmp_path / "bad")).append(geometries, ["{}"])
+
+
+def test_combine_reads_in_chunks(shp_dir, tmp_path):
+    """Test every state is combined across chunk boundaries."""
+    buffer = combine_to_buffer(shp_dir, str(tmp_path / "combined"), chunk_size=3)
+    assert len(buffer) == 14
+    assert buffer.properties(13, 14) == [
+        '{"GEOID":"02001000006","STATEFP":"02","MTFCC":"G5020"}'
+    ]
+    assert combine_to_buffer(str(tmp_path / "missing"), str(tmp_path / "x")) is None
+
+
+def test_build_matches_in_memory(shp_dir, tmp_path):
+    """Test the out-of-core chain matches combine + simplify in memory."""
+    combined_path = str(tmp_path / "combined.geojson")
+    expected_path = str(tmp_path / "expected.geojson")
+    convert_to_geojson(shp_dir, combined_path, schema=TRACT_SCHEMA)
+    simplify_geojson(combined_path, expected_path, 0.05)
+
+    output_path = str(tmp_path / "out.geojson")
+    result = build_out_of_core(
+        shp_dir, output_path, 0.05, schema=TRACT_SCHEMA, chunk_size=4
+    )
+    assert result == output_path
+    assert not os.path.exists(f"{output_path}.buffers")
+
+    expected = gpd.read_file(expected_path)
+    out = gpd.read_file(output_path)
+    assert out.crs == expected.crs
+    assert list(out["GEOID"]) == list(expected["GEOID"])
+    assert list(out.columns) == ["GEOID", "STATEFP", "geometry"]
+    assert out.is_valid.all()
+    assert shapely.equals_exact(
+        out.geometry.values, expected.geometry.values, 1e-9
+    ).all()
+
+
+def test_build_in_equal_area_crs(shp_dir, tmp_path):
+    """Test metre tolerances and WGS84 output, keeping buffers on request."""
+    output_path = str(tmp_path / "out.geojson")
+    work_dir = str(tmp_path / "work")
+    build_out_of_core(
+        shp_dir,
+        output_path,
+        1000,
+        crs="EPSG:6933",
+        work_dir=work_dir,
+        chunk_size=5,
+        keep_buffers=True,
+    )
+    assert sorted(os.listdir(work_dir)) == ["combined", "repaired", "simplified"]
+    out = gpd.read_file(output_path)
+    assert out.crs.to_epsg() == 4326
+    assert len(out) == 14
+
+
+def test_build_in_regional_crs(shp_dir, tmp_path):
+    """Test per-state regional simplification matches the in-memory build."""
+    combined_path = str(tmp_path / "combined.geojson")
+    expected_path = str(tmp_path / "expected.geojson")
+    convert_to_geojson(shp_dir, combined_path)
+    simplify_geojson(combined_path, expected_path, 1000, crs=REGIONAL)
+
+    output_path = str(tmp_path / "out.geojson")
+    build_out_of_core(shp_dir, output_path, 1000, crs=REGIONAL, chunk_size=4)
+    expected = gpd.read_file(expected_path)
+    out = gpd.read_file(output_path)
+    assert out.crs.to_epsg() == 4326
+    assert shapely.equals_exact(
+        out.geometry.values, expected.geometry.values, 1e-9
+    ).all()
+
+
+@pytest.mark.parametrize("kind", ["queen", "rook"])
+def test_buffer_adjacency_matches_in_memory(tmp_path, kind):
+    """Test chunked contiguity over a buffer matches build_adjacency."""
+    cells = [box(x, y, x + 1, y + 1) for y in range(4) for x in range(5)]
+    gdf = gpd.GeoDataFrame(
+        {"GEOID": [f"01001{i:06d}" for i in range(20)]}, geometry=cells
+    )
+    path = str(tmp_path / "grid")
+    with GeometryBufferWriter(path) as writer:
+        writer.append(cells, [f'{{"GEOID": "{g}"}}' for g in gdf["GEOID"]])
+
+    buffer = GeometryBuffer(path)
+    adjacency = build_buffer_adjacency(buffer, kind, chunk_size=6)
+    expected = build_adjacency(gdf, kind)
+    assert (adjacency != expected).nnz == 0
+    assert adjacency.sum() == (110 if kind == "queen" else 62)
+    assert list(buffer.column("GEOID", chunk_size=7)) == list(gdf["GEOID"])
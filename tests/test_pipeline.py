@@ -0,0 +1,129 @@
+import glob
+import os
+import time
+import zipfile
+from functools import partial
+import geopandas as gpd
+import pandas as pd
+import pytest
+from pipeline import Task, plan, run_pipeline, build_default_pipeline
+from profiling import synthetic_acs_csv, synthetic_shapefiles
+
+
+def test_plan_waves_and_cycles():
+    """Test tasks are grouped into dependency waves and cycles rejected."""
+    tasks = [
+        Task("fetch", print),
+        Task("acs_clean", print, deps=("fetch",)),
+        Task("ingest", print, deps=("fetch",)),
+        Task("render", print, deps=("acs_clean", "ingest")),
+    ]
+    assert plan(tasks) == [["fetch"], ["acs_clean", "ingest"], ["render"]]
+
+    with pytest.raises(ValueError, match="cycle"):
+        plan([Task("a", print, deps=("b",)), Task("b", print, deps=("a",))])
+    with pytest.raises(ValueError, match="unknown"):
+        plan([Task("a", print, deps=("missing",))])
+
+
+def test_run_pipeline_parallel_branches():
+    """Test independent branches overlap so time tracks the longer branch."""
+    tasks = [
+        Task("acs", partial(time.sleep, 0.3)),
+        Task("geometry", partial(time.sleep, 0.3)),
+        Task("power", partial(pow, 2, 10), executor="process"),
+        Task("join", lambda: "joined", deps=("acs", "geometry", "power")),
+    ]
+
+    start = time.perf_counter()
+    results = run_pipeline(tasks, max_workers=4)
+    assert time.perf_counter() - start < 0.55
+    assert results["join"] == "joined"
+    assert results["power"] == 1024
+
+
+def test_run_pipeline_retries_and_failures():
+    """Test retries, and that downstream tasks are skipped after a failure."""
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise IOError("connection reset")
+        return "fetched"
+
+    def broken():
+        raise ValueError("bad input")
+
+    ran = []
+    tasks = [
+        Task("fetch", flaky, retries=1),
+        Task("simplify", broken, deps=("fetch",)),
+        Task("render", lambda: ran.append("render"), deps=("simplify",)),
+        Task("acs_clean", lambda: ran.append("acs"), deps=("fetch",)),
+    ]
+
+    with pytest.raises(RuntimeError, match=r"failed at \['simplify'\]"):
+        run_pipeline(tasks, retry_delay=0)
+    assert len(calls) == 2
+    assert ran == ["acs"]
+
+
+def test_default_pipeline_dry_run(capsys):
+    """Test the declared stages and their dry-run plan."""
+    waves = run_pipeline(build_default_pipeline(), dry_run=True)
+    assert waves == [
+        ["fetch"],
+        ["acs_clean", "shapefile_ingest"],
+        ["repair"],
+        ["index", "simplify"],
+        ["join"],
+        ["render", "stats"],
+    ]
+    assert "Wave 2: acs_clean, shapefile_ingest" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("out_of_core", [False, True])
+def test_default_pipeline_end_to_end(tmp_path, out_of_core):
+    """Test synthetic TIGER zips and ACS data run through to the map."""
+    data_dir = tmp_path / "data"
+    output_dir = tmp_path / "output"
+    zip_dir = data_dir / "tractzips"
+    zip_dir.mkdir(parents=True)
+    output_dir.mkdir()
+
+    shp_dir = str(tmp_path / "synthetic")
+    synthetic_shapefiles(shp_dir, 32, states=2)
+    for shp in glob.glob(os.path.join(shp_dir, "*.shp")):
+        stem = os.path.splitext(os.path.basename(shp))[0]
+        with zipfile.ZipFile(zip_dir / f"{stem}.zip", "w") as zf:
+            for part in glob.glob(os.path.join(shp_dir, stem + ".*")):
+                zf.write(part, os.path.basename(part))
+    geoids = pd.concat(
+        gpd.read_file(shp)["GEOID"] for shp in glob.glob(os.path.join(shp_dir, "*.shp"))
+    ).tolist()
+
+    raw_csv = str(data_dir / "acs.csv")
+    synthetic_acs_csv(raw_csv, 0, geoids=geoids)
+    token_file = tmp_path / "token.txt"
+    token_file.write_text("pk.test")
+    output_html = str(output_dir / "map.html")
+
+    results = run_pipeline(
+        build_default_pipeline(
+            raw_csv=raw_csv,
+            processed_csv=str(output_dir / "acs_processed.csv"),
+            simplified_json=str(output_dir / "tracts_simplified.geojson"),
+            token_file=str(token_file),
+            output_html=output_html,
+            out_of_core=out_of_core,
+        ),
+        retry_delay=0,
+    )
+
+    assert results["join"]["passed"]
+    assert os.path.exists(output_html)
+    stats = pd.read_csv(results["stats"], dtype={"GEOID": str})
+    assert sorted(stats["GEOID"]) == sorted(geoids)
+    assert stats["Total_Population_lag"].notna().all()
+    assert not os.path.exists(output_dir / "buffers")
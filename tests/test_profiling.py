@@ -0,0 +1,78 @@
+import pandas as pd
+import geopandas as gpd
+from profiling import (
+    synthetic_acs_csv,
+    synthetic_shapefiles,
+    run_benchmarks,
+    baseline_metrics,
+    compare_to_baseline,
+    compare_implementations,
+)
+
+
+def test_synthetic_inputs(tmp_path):
+    """Test the generators produce ACS-shaped rows and repairable tracts."""
+    csv_path = synthetic_acs_csv(tmp_path / "acs.csv", 20)
+    df = pd.read_csv(csv_path, dtype=str)
+    assert len(df) == 21
+    assert df["GEO_ID"].iloc[1].startswith("1400000US")
+
+    shp_dir = synthetic_shapefiles(str(tmp_path / "shp"), 100, states=2)
+    gdf = gpd.read_file(f"{shp_dir}/tl_2021_01_tract.shp")
+    assert len(gdf) == 50
+    assert not gdf.is_valid.all()
+
+
+def test_run_benchmarks_and_compare(tmp_path):
+    """Test a small run records every stage and regressions are flagged."""
+    report = run_benchmarks([50], workdir=str(tmp_path), top=3)
+    results = report["results"]
+    assert set(results) == {
+        "process_csv",
+        "convert_to_geojson",
+        "convert_to_geojson_stream",
+    }
+    measurement = results["convert_to_geojson"]["50"]
+    assert measurement["implementation"] == "geojson_utils.convert_to_geojson"
+    assert measurement["seconds"] > 0
+    assert measurement["peak_bytes"] > 0
+    assert len(measurement["hotspots"]) == 3
+
+    assert measurement["relative_seconds"] > 0
+    assert measurement["bytes_per_row"] == round(measurement["peak_bytes"] / 50, 1)
+
+    # The stored baseline keeps only machine-independent metrics
+    baseline = baseline_metrics(report)
+    assert baseline["results"]["convert_to_geojson"]["50"] == {
+        "implementation": "geojson_utils.convert_to_geojson",
+        "relative_seconds": measurement["relative_seconds"],
+        "bytes_per_row": measurement["bytes_per_row"],
+    }
+    assert "environment" not in baseline
+
+    assert compare_to_baseline(report, baseline) == []
+    faster = {
+        "results": {
+            "process_csv": {"50": {"relative_seconds": 1e-6, "bytes_per_row": 0}}
+        }
+    }
+    regressions = compare_to_baseline(report, faster)
+    now = results["process_csv"]["50"]["relative_seconds"]
+    assert regressions == [f"process_csv[50] relative_seconds: 1e-06 -> {now}"]
+
+
+def test_compare_implementations(tmp_path):
+    """Test the unified stages are timed against the ones they replaced."""
+    comparison = compare_implementations([40], workdir=str(tmp_path))
+    assert list(comparison["process_csv"]["40"]) == [
+        "data_processing.process_csv",
+        "profiling.legacy_choropleth_process_csv",
+        "profiling.legacy_data_processing_process_csv",
+    ]
+    assert list(comparison["convert_to_geojson"]["40"]) == [
+        "geojson_utils.convert_to_geojson",
+        "profiling.legacy_choropleth_convert_to_geojson",
+    ]
+    unified = comparison["convert_to_geojson"]["40"]["geojson_utils.convert_to_geojson"]
+    assert unified["relative_to_unified"] == 1.0
+    assert unified["seconds"] > 0
@@ -0,0 +1,171 @@
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+import shapely.affinity
+from shapely.geometry import box
+from geojson_utils import simplify_geojson
+from projection import (
+    CONUS_CRS,
+    REGIONAL,
+    REGIONAL_CRS,
+    get_transformer,
+    reproject,
+    regional_crs,
+    to_regional,
+    from_regional,
+    to_equal_area,
+    to_wgs84,
+    units_per_degree,
+    add_density,
+    density_csv,
+)
+
+
+@pytest.fixture
+def tracts():
+    """Two 0.1-degree tracts, one near the equator and one in Alaska."""
+    return gpd.GeoDataFrame(
+        {"GEOID": ["72001956300", "02020000101"]},
+        geometry=[box(-66.0, 18.0, -65.9, 18.1), box(-150.0, 61.0, -149.9, 61.1)],
+        crs="EPSG:4269",
+    )
+
+
+def test_reproject_round_trip(tracts):
+    """Test batched reprojection matches pyproj and round-trips to WGS84."""
+    projected = to_equal_area(tracts)
+    assert projected.crs.to_epsg() == 6933
+    assert get_transformer.cache_info().currsize >= 1
+
+    expected = tracts.to_crs("EPSG:6933").geometry.values
+    assert shapely.equals_exact(projected.geometry.values, expected, 1e-3).all()
+
+    back = to_wgs84(projected)
+    assert back.crs.to_epsg() == 4326
+    assert np.allclose(back.total_bounds, tracts.total_bounds, atol=1e-6)
+
+    batched = reproject(tracts.geometry.values, "EPSG:4269", "EPSG:6933", 1)
+    assert shapely.equals_exact(batched, expected, 1e-3).all()
+
+
+def test_add_density_uses_true_area(tracts):
+    """Test equal-sized degree boxes get areas reflecting their latitude."""
+    df = pd.DataFrame(
+        {"GEOID": ["72001956300", "02020000101", "06001400100"], "Pop": [100, 100, 5]}
+    )
+    out = add_density(df, tracts, ["Pop"])
+
+    # 0.1 degrees of longitude shrinks with cos(latitude)
+    assert out["Area_km2"].iloc[0] == pytest.approx(116.8, rel=0.01)
+    assert out["Area_km2"].iloc[1] == pytest.approx(59.7, rel=0.01)
+    assert out["Pop_per_km2"].iloc[1] > out["Pop_per_km2"].iloc[0]
+    assert pd.isna(out["Pop_per_km2"].iloc[2])
+
+
+def test_density_csv(tracts, tmp_path):
+    """Test the file-level density stage."""
+    json_file = str(tmp_path / "tracts.geojson")
+    tracts.to_file(json_file, driver="GeoJSON")
+    csv_file = tmp_path / "data.csv"
+    pd.DataFrame({"GEOID": tracts["GEOID"], "Pop": [10, 20]}).to_csv(
+        csv_file, index=False
+    )
+
+    out = density_csv(csv_file, json_file, tmp_path / "density.csv", ["Pop"])
+    written = pd.read_csv(tmp_path / "density.csv", dtype={"GEOID": str})
+    assert list(written["Pop_per_km2"].round(6)) == list(out["Pop_per_km2"].round(6))
+
+
+def test_simplify_geojson_in_metres(tracts, tmp_path):
+    """Test a metre tolerance is applied in the equal-area CRS."""
+    circle = shapely.Point(-150.0, 61.0).buffer(0.05, quad_segs=64)
+    gdf = gpd.GeoDataFrame({"GEOID": ["02020000102"]}, geometry=[circle], crs=4269)
+    input_path = str(tmp_path / "in.geojson")
+    gdf.to_file(input_path, driver="GeoJSON")
+
+    output_path = str(tmp_path / "out.geojson")
+    result = simplify_geojson(input_path, output_path, 500, crs="EPSG:6933")
+    assert result == output_path
+
+    out = gpd.read_file(output_path)
+    assert out.crs.to_epsg() == 4326
+    assert shapely.get_num_coordinates(out.geometry.values)[0] < 257
+    assert out.geometry.iloc[0].intersects(shapely.Point(-150.0, 61.0))
+
+
+@pytest.mark.parametrize("crs", ["EPSG:6933", REGIONAL])
+def test_simplify_geojson_budget_in_metres(tmp_path, crs):
+    """Test budget bisection bounds are rescaled to the projection's units."""
+    circles = [shapely.Point(-86.0, 32.0 + i).buffer(0.3, 64) for i in range(2)]
+    gdf = gpd.GeoDataFrame(
+        {"GEOID": ["01001020100", "01001020200"]}, geometry=circles, crs=4326
+    )
+    input_path = str(tmp_path / "in.geojson")
+    gdf.to_file(input_path, driver="GeoJSON")
+
+    output_path = str(tmp_path / "out.geojson")
+    result = simplify_geojson(input_path, output_path, max_vertices=40, crs=crs)
+    assert result == output_path
+    out = gpd.read_file(output_path)
+    assert out.crs.to_epsg() == 4326
+    assert shapely.get_num_coordinates(out.geometry.values).sum() <= 40
+
+
+def test_units_per_degree():
+    """Test a degree of latitude is measured in each projection."""
+    assert units_per_degree("EPSG:4326") == 1.0
+    # EASE-Grid 2.0 stretches north-south by 1 / cos(30°) at the equator
+    assert units_per_degree("EPSG:6933") == pytest.approx(127_570, rel=1e-3)
+    for crs in [CONUS_CRS, REGIONAL, REGIONAL_CRS["02"], REGIONAL_CRS["72"]]:
+        assert units_per_degree(crs) == pytest.approx(111_000, rel=0.01)
+
+
+def test_regional_crs(tracts):
+    """Test states map to their regional CRS and back without loss."""
+    assert regional_crs("06") == regional_crs(6) == CONUS_CRS
+    assert regional_crs("02") == "EPSG:3338"
+    assert regional_crs("72") == REGIONAL_CRS["72"]
+    assert "+lat_0=18.05 +lon_0=-65.95" in regional_crs(
+        "99", tracts.geometry.values[:1], "EPSG:4269"
+    )
+    with pytest.raises(ValueError):
+        regional_crs("99")
+
+    projected, partitions = to_regional(tracts.geometry.values, ["72", "02"])
+    assert sorted(partitions) == sorted([REGIONAL_CRS["72"], "EPSG:3338"])
+    # 0.1 degrees of latitude is about 11 km north-south in every region
+    for polygon in projected:
+        east_edge = shapely.get_coordinates(polygon)[:2]
+        assert np.hypot(*np.diff(east_edge, axis=0)[0]) == pytest.approx(
+            11_100, rel=0.01
+        )
+    back = from_regional(projected, partitions, "EPSG:4269")
+    assert shapely.equals_exact(back, tracts.geometry.values, 1e-7).all()
+
+
+@pytest.mark.parametrize("crs, keeps_teeth", [(REGIONAL, True), ("EPSG:6933", False)])
+def test_simplify_geojson_tolerance_in_true_metres(tmp_path, crs, keeps_teeth):
+    """Test a metre tolerance is a true distance at high latitude."""
+    # A 10 km strip near Anchorage whose top edge has 300 m north-south teeth
+    x0, y0 = shapely.get_coordinates(
+        reproject([shapely.Point(-150.0, 61.0)], "EPSG:4326", "EPSG:3338")
+    )[0]
+    top = [(x, 5000 + 300 * (i % 2)) for i, x in enumerate(range(10_000, -1, -500))]
+    strip = shapely.Polygon([(0, 0), (10_000, 0), *top])
+    strip = shapely.affinity.translate(strip, x0, y0)
+    geometry = reproject([strip], "EPSG:3338", "EPSG:4326")
+    input_path = str(tmp_path / "in.geojson")
+    gpd.GeoDataFrame({"GEOID": ["02020000101"]}, geometry=geometry, crs=4326).to_file(
+        input_path, driver="GeoJSON"
+    )
+
+    output_path = str(tmp_path / "out.geojson")
+    simplify_geojson(input_path, output_path, 200, crs=crs)
+    out = reproject(gpd.read_file(output_path).geometry.values, 4326, "EPSG:3338")
+
+    # The teeth exceed the 200 m tolerance, but EASE-Grid shrinks them to
+    # about 170 m at 61°N, so only the regional CRS keeps them
+    deviation = shapely.hausdorff_distance(out[0], strip)
+    assert bool(deviation < 200) == keeps_teeth
@@ -0,0 +1,103 @@
+import json
+import numpy as np
+import pandas as pd
+from validation import validate_table, validate_acs_csv
+
+
+def test_validate_acs_csv(tmp_path):
+    """Test sentinel, duplicate, coverage and outlier checks end to end."""
+    raw = pd.DataFrame(
+        {
+            "GEO_ID": ["Geography"] + [f"1400000US0100102010{i}" for i in range(6)],
+            "S2701_C01_001E": [
+                "Estimate!!Total",
+                "1000",
+                "(X)",
+                "-666666666",
+                "*****",
+                "abc",
+                "90000",
+            ],
+        }
+    )
+    raw_file = tmp_path / "raw.csv"
+    raw.to_csv(raw_file, index=False)
+
+    processed = pd.DataFrame(
+        {
+            "GEOID": ["01001", "01002", "01003", "01004", "01004", "01006"],
+            "Total_Population": [1000, 1100, 1200, 1300, 1400, 90000],
+        }
+    )
+    processed_file = tmp_path / "processed.csv"
+    processed.to_csv(processed_file, index=False)
+
+    json_file = tmp_path / "tracts.json"
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"GEOID": geoid},
+            "geometry": {"type": "Point", "coordinates": [0, 0]},
+        }
+        for geoid in ["01001", "01002", "09999"]
+    ]
+    json_file.write_text(
+        json.dumps({"type": "FeatureCollection", "features": features})
+    )
+
+    report_path = tmp_path / "report.json"
+    report = validate_acs_csv(
+        raw_file,
+        processed_file,
+        {"S2701_C01_001E": "Total_Population"},
+        str(json_file),
+        str(report_path),
+    )
+
+    assert json.loads(report_path.read_text()) == report
+    assert report["sentinels"]["S2701_C01_001E"] == {
+        "sentinels": 3,
+        "non_numeric": 1,
+        "missing": 0,
+    }
+    assert report["duplicate_geoids"]["sample"] == ["01004"]
+    assert report["coverage"]["matched"] == 2
+    assert report["coverage"]["geometry_only"] == 1
+    assert report["values"]["Total_Population"]["outliers"] == 1
+    assert report["errors"] == ["duplicate_geoids"]
+    assert report["passed"] is False
+
+
+def test_validate_table_flags_sentinels():
+    """Test sentinels left in a processed table fail validation."""
+    df = pd.DataFrame(
+        {
+            "GEOID": ["01001020100", "01001020200", "01001020300"],
+            "Total_Population": [1000, -666666666, None],
+        }
+    )
+    report = validate_table(df, ["Total_Population"])
+    assert report["values"]["Total_Population"]["sentinels"] == 1
+    assert report["values"]["Total_Population"]["missing"] == 1
+    assert report["values"]["Total_Population"]["negative"] == 0
+    assert report["errors"] == ["sentinel_values"]
+
+
+def test_validate_table_national_scale():
+    """Test validation of a national-scale table of 85k tracts."""
+    rng = np.random.default_rng(0)
+    geoids = pd.Series([f"{i:011d}" for i in range(85_000)])
+    df = pd.DataFrame(
+        {"GEOID": geoids, "Total_Population": rng.integers(0, 9000, len(geoids))}
+    )
+    raw = pd.DataFrame({"S2701_C01_001E": df["Total_Population"].astype(str)})
+
+    report = validate_table(
+        df,
+        ["Total_Population"],
+        raw=raw,
+        raw_columns=["S2701_C01_001E"],
+        geometry_geoids=geoids,
+    )
+    assert report["passed"]
+    assert report["coverage"]["geometry_share"] == 1.0
@@ -2,7 +2,17 @@ import pytest
 import pandas as pd
 import json
 import os
-from visualization import generate_choropleth
+import numpy as np
+import geopandas as gpd
+import matplotlib.image as plt_image
+from matplotlib import colormaps
+from shapely.geometry import box
+from visualization import (
+    generate_choropleth,
+    generate_static_choropleth,
+    build_hover_payload,
+    render_static_map,
+)
 
 
 @pytest.fixture
@@ -117,3 +127,88 @@ def test_generate_choropleth_no_matching_geoids(sample_data, tmp_path):
             sample_data["token_path"],
             output_path,
         )
+
+
+@pytest.mark.parametrize("extension", ["png", "svg"])
+def test_generate_static_choropleth(sample_data, tmp_path, extension):
+    """Test offline raster rendering without a Mapbox token."""
+    output_path = tmp_path / f"thumb.{extension}"
+
+    fig = generate_static_choropleth(
+        sample_data["csv_path"],
+        sample_data["json_path"],
+        str(output_path),
+        width=200,
+        height=120,
+        title="Total Population",
+    )
+
+    assert output_path.exists() and output_path.stat().st_size > 0
+    assert fig.get_size_inches().tolist() == [2.0, 1.2]
+    if extension == "png":
+        assert output_path.read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+
+
+def test_generate_static_choropleth_no_matching_geoids(sample_data, tmp_path):
+    """Test static rendering with no matching GEOIDs."""
+    df = pd.DataFrame({"GEOID": ["99999", "88888"], "Total_Population": [1000, 2000]})
+    no_match_csv = tmp_path / "no_match.csv"
+    df.to_csv(no_match_csv, index=False)
+
+    with pytest.raises(ValueError, match="No matching GEOIDs found"):
+        generate_static_choropleth(
+            str(no_match_csv), sample_data["json_path"], str(tmp_path / "out.png")
+        )
+
+
+def test_generate_choropleth_hover_payload(sample_data, tmp_path):
+    """Test rich tooltips are written as a deduplicated label payload."""
+    df = pd.DataFrame(
+        {
+            "GEOID": ["01001", "01002"],
+            "Total_Population": [1000, 2000],
+            "County": ["Autauga County", "Autauga County"],
+            "State": ["Alabama", "Alabama"],
+            "Total_Population_MOE": [150.0, None],
+        }
+    )
+    csv_path = tmp_path / "hover.csv"
+    df.to_csv(csv_path, index=False)
+    output_path = tmp_path / "output.html"
+
+    generate_choropleth(
+        str(csv_path),
+        sample_data["json_path"],
+        sample_data["token_path"],
+        str(output_path),
+        hover_columns=["County", "State", "Total_Population_MOE"],
+    )
+
+    html = output_path.read_text()
+    assert html.count("Autauga County") == 1
+    assert '"codes":[0,0]' in html
+    assert '"values":[150.0,null]' in html
+
+
+def test_build_hover_payload():
+    """Test dictionary encoding of repeated and missing strings."""
+    df = pd.DataFrame({"County": ["A", "B", "A", None]})
+    payload = build_hover_payload(df, ["County"])
+    assert payload["fields"][0]["table"] == ["A", "B"]
+    assert payload["fields"][0]["codes"] == [0, 1, 0, -1]
+
+
+def test_render_static_map_keeps_holes(tmp_path):
+    """Test a donut tract does not paint over the enclave tract inside it."""
+    enclave = box(4, 4, 6, 6)
+    donut = box(0, 0, 10, 10).difference(enclave)
+    # Enclave first, so a hole-less donut would be drawn on top of it
+    gdf = gpd.GeoDataFrame({"GEOID": ["01001", "01002"]}, geometry=[enclave, donut])
+    output_path = tmp_path / "enclave.png"
+    render_static_map(gdf, [100, 0], str(output_path), width=100, height=100, vmax=100)
+
+    image = plt_image.imread(output_path)
+    low, high = colormaps["Reds"](0.0), colormaps["Reds"](1.0)
+    centre = image[50, 50, :3]
+    assert np.allclose(centre, high[:3], atol=0.05)
+    assert np.allclose(image[5, 5, :3], low[:3], atol=0.05)
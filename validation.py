@@ -0,0 +1,166 @@
+import json
+
+import geopandas as gpd
+import pandas as pd
+
+# ACS annotation values that stand in for missing or suppressed estimates
+# (see the Census "Notes on ACS Estimate and Annotation Values")
+SENTINEL_NUMBERS = [
+    -999999999,
+    -888888888,
+    -666666666,
+    -555555555,
+    -333333333,
+    -222222222,
+]
+SENTINEL_STRINGS = ["(X)", "*****", "***", "**", "-", "N", "null"]
+
+
+def check_sentinels(raw, columns):
+    """Count ACS sentinel and non-numeric values per raw column."""
+    result = {}
+    for col in columns:
+        text = raw[col].astype("string").str.strip()
+        numeric = pd.to_numeric(text, errors="coerce")
+        sentinel = text.isin(SENTINEL_STRINGS) | numeric.isin(SENTINEL_NUMBERS)
+        non_numeric = numeric.isna() & text.notna() & ~sentinel
+        result[col] = {
+            "sentinels": int(sentinel.sum()),
+            "non_numeric": int(non_numeric.sum()),
+            "missing": int(text.isna().sum()),
+        }
+    return result
+
+
+def check_values(df, columns, iqr_factor=3.0):
+    """
+    Count missing values, leftover sentinels, negative values and IQR
+    outliers per processed column. Sentinels are excluded from the value
+    statistics but counted, since a processed table should hold NaN there.
+    """
+    result = {}
+    for col in columns:
+        values = pd.to_numeric(df[col], errors="coerce")
+        sentinel = values.isin(SENTINEL_NUMBERS)
+        valid = values[~sentinel]
+        result[col] = {
+            "missing": int(values.isna().sum()),
+            "sentinels": int(sentinel.sum()),
+            "negative": int((valid < 0).sum()),
+            "zero": int((valid == 0).sum()),
+            "outliers": 0,
+            "outlier_bounds": None,
+        }
+        if valid.notna().any():
+            q1, q3 = valid.quantile([0.25, 0.75])
+            low, high = q1 - iqr_factor * (q3 - q1), q3 + iqr_factor * (q3 - q1)
+            result[col]["outliers"] = int(((valid < low) | (valid > high)).sum())
+            result[col]["outlier_bounds"] = [float(low), float(high)]
+    return result
+
+
+def check_duplicates(geoids, sample_size=10):
+    """Report GEOIDs that appear more than once."""
+    duplicated = geoids[geoids.duplicated(keep=False)]
+    unique = duplicated.unique()
+    return {
+        "count": int(len(unique)),
+        "rows": int(len(duplicated)),
+        "sample": [str(g) for g in unique[:sample_size]],
+    }
+
+
+def check_coverage(geoids, geometry_geoids, sample_size=10):
+    """Compare table GEOIDs against the GEOIDs present in the geometry."""
+    table = pd.Index(geoids.astype(str).unique())
+    geometry = pd.Index(pd.Series(geometry_geoids).astype(str).unique())
+    matched = table.intersection(geometry)
+    missing_geometry = table.difference(geometry)
+    missing_data = geometry.difference(table)
+    share = len(matched) / len(geometry) if len(geometry) else 0.0
+    return {
+        "matched": int(len(matched)),
+        "table_only": int(len(missing_geometry)),
+        "geometry_only": int(len(missing_data)),
+        "geometry_share": float(share),
+        "table_only_sample": [str(g) for g in missing_geometry[:sample_size]],
+    }
+
+
+def validate_table(df, columns, raw=None, raw_columns=None, geometry_geoids=None):
+    """
+    Run all data-quality checks over a processed tract table.
+
+    Args:
+        df (pd.DataFrame): Processed table with a GEOID column
+        columns (list): Processed value columns to check
+        raw (pd.DataFrame): Optional raw ACS table read with dtype=str
+        raw_columns (list): Raw columns to scan for sentinels
+        geometry_geoids (array-like): Optional GEOIDs present in the geometry
+
+    Returns:
+        dict: Machine-readable report; report["passed"] is False when an
+        error-level check (duplicate GEOIDs, sentinel values left in the
+        processed table, no geometry coverage) fails
+    """
+    report = {
+        "rows": int(len(df)),
+        "duplicate_geoids": check_duplicates(df["GEOID"]),
+        "values": check_values(df, columns),
+    }
+    if raw is not None:
+        report["sentinels"] = check_sentinels(raw, raw_columns or [])
+    if geometry_geoids is not None:
+        report["coverage"] = check_coverage(df["GEOID"], geometry_geoids)
+
+    errors = []
+    if report["duplicate_geoids"]["count"]:
+        errors.append("duplicate_geoids")
+    if any(stats["sentinels"] for stats in report["values"].values()):
+        errors.append("sentinel_values")
+    if "coverage" in report and report["coverage"]["matched"] == 0:
+        errors.append("coverage")
+    report["errors"] = errors
+    report["passed"] = not errors
+    return report
+
+
+def validate_acs_csv(
+    raw_file, processed_file, column_mapping, json_file=None, report_path=None
+):
+    """
+    Validate the output of process_acs_csv against its raw input.
+
+    Args:
+        raw_file (str): Raw ACS CSV
+        processed_file (str): Processed CSV written by process_acs_csv
+        column_mapping (dict): Raw ACS column -> processed column name
+        json_file (str): Optional tract GeoJSON to check coverage against
+        report_path (str): Optional path to save the JSON report
+
+    Returns:
+        dict: The validation report
+    """
+    raw = pd.read_csv(raw_file, dtype=str, usecols=["GEO_ID", *column_mapping])
+    # Only tract rows, as in process_acs_csv; this drops the description row
+    raw = raw[raw["GEO_ID"].str.startswith("1400000US", na=False)]
+    df = pd.read_csv(processed_file, dtype={"GEOID": str})
+
+    geometry_geoids = None
+    if json_file:
+        geometry_geoids = gpd.read_file(
+            json_file, columns=["GEOID"], ignore_geometry=True
+        )["GEOID"]
+
+    report = validate_table(
+        df,
+        list(column_mapping.values()),
+        raw=raw,
+        raw_columns=list(column_mapping),
+        geometry_geoids=geometry_geoids,
+    )
+
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
@@ -1,9 +1,161 @@
 import pandas as pd
+import numpy as np
 import json
+import geopandas as gpd
+import shapely
 import plotly.express as px
+from matplotlib import colormaps, rc_context
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PathCollection
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from matplotlib.path import Path
 
+# Fixed plot div ID; plotly otherwise embeds a random one in every HTML file
+CHOROPLETH_DIV_ID = "census-tract-choropleth"
 
-def generate_choropleth(csv_file, json_file, token_file, output_html):
+
+def build_choropleth_figure(
+    df,
+    geojson_data,
+    column="Total_Population",
+    range_color=None,
+    center=None,
+    zoom=3.5,
+    title="Census Tract Population Distribution",
+    featureidkey="properties.GEOID",
+):
+    """
+    Build the Mapbox choropleth figure from in-memory data.
+
+    Args:
+        df: DataFrame with a GEOID column and the column to map
+        geojson_data: GeoJSON FeatureCollection dict with GEOID properties
+        column: Column used to color the tracts
+        range_color: (min, max) color range (defaults to 0..99th percentile)
+        center: Map center as {"lat": ..., "lon": ...} (defaults to the U.S.)
+        zoom: Initial Mapbox zoom level
+        title: Map title
+        featureidkey: Feature key GEOIDs are matched on ("id" for features
+            that carry their GEOID as the feature id)
+
+    Returns:
+        plotly.graph_objects.Figure: The configured figure
+    """
+    label = column.replace("_", " ")
+    if range_color is None:
+        range_color = (0, df[column].quantile(0.99))
+    if center is None:
+        center = {"lat": 37.0902, "lon": -95.7129}
+
+    fig = px.choropleth_mapbox(
+        df,
+        geojson=geojson_data,
+        locations="GEOID",
+        color=column,
+        color_continuous_scale="Reds",
+        range_color=range_color,
+        featureidkey=featureidkey,
+        mapbox_style="light",
+        zoom=zoom,
+        opacity=1.0,
+        center=center,
+        hover_data={column: True},
+        labels={column: label},
+    )
+
+    fig.update_traces(marker_line_width=0.000000001, marker_line_color="#D3D3D3")
+
+    fig.update_layout(
+        margin={"r": 0, "t": 25, "l": 0, "b": 0},
+        title={
+            "text": title,
+            "xanchor": "center",
+            "x": 0.5,
+        },
+        coloraxis_colorbar={
+            "title": label,
+            "title_side": "bottom",
+            "orientation": "h",
+            "x": 0.5,
+            "xanchor": "center",
+            "y": -0.00000001,
+            "yanchor": "top",
+            "len": 0.9,
+        },
+        annotations=[
+            {
+                "text": "Source: U.S. Census Bureau, American Community Survey",
+                "xref": "paper",
+                "yref": "paper",
+                "x": 0.01,
+                "y": 0.01,
+                "showarrow": False,
+                "font": {"size": 10},
+                "align": "left",
+            }
+        ],
+    )
+    return fig
+
+
+def build_hover_payload(df, columns):
+    """
+    Dictionary-encode hover columns so repeated strings are stored once.
+
+    Text columns become a lookup table of unique values plus one small
+    integer code per tract (-1 for missing). Numeric columns are kept as
+    plain value arrays.
+
+    Args:
+        df: DataFrame in the same row order as the plotted trace
+        columns: Columns to show in the tooltip, in display order
+
+    Returns:
+        dict: JSON-serializable payload for hover_script
+    """
+    fields = []
+    for col in columns:
+        field = {"label": col.replace("_", " ")}
+        if pd.api.types.is_numeric_dtype(df[col]):
+            values = df[col].astype("float64")
+            field["values"] = [None if pd.isna(v) else v for v in values.tolist()]
+        else:
+            codes, uniques = pd.factorize(df[col])
+            field["table"] = [str(v) for v in uniques]
+            field["codes"] = codes.tolist()
+        fields.append(field)
+    return {"fields": fields}
+
+
+def hover_script(payload, value_label):
+    """
+    JavaScript that rebuilds full tooltip labels in the browser.
+
+    Meant for write_html(post_script=...); plotly substitutes {plot_id}.
+    """
+    # Escape "</" so table strings cannot close the surrounding <script>
+    encoded = json.dumps(payload, separators=(",", ":")).replace("</", "<\\/")
+    return (
+        "var gd = document.getElementById('{plot_id}');\n"
+        f"var payload = {encoded};\n"
+        "var n = gd.data[0].locations.length;\n"
+        "var text = new Array(n);\n"
+        "for (var i = 0; i < n; i++) {\n"
+        "  text[i] = payload.fields.map(function (f) {\n"
+        "    var v = f.table ? (f.codes[i] < 0 ? null : f.table[f.codes[i]])\n"
+        "                    : f.values[i];\n"
+        "    return f.label + ': ' + (v === null ? 'N/A' : v);\n"
+        "  }).join('<br>');\n"
+        "}\n"
+        "Plotly.restyle(gd, {text: [text], hovertemplate: "
+        f"'%{{text}}<br>{value_label}: %{{z}}<extra></extra>'}}, [0]);\n"
+    )
+
+
+def generate_choropleth(
+    csv_file, json_file, token_file, output_html, hover_columns=None
+):
     """
     Generate an interactive choropleth map using Census tract data.
 
@@ -12,6 +164,8 @@ def generate_choropleth(csv_file, json_file, token_file, output_html):
         json_file: Path to GeoJSON with tract boundaries
         token_file: Path to Mapbox access token file
         output_html: Path to save the output HTML map
+        hover_columns: Optional extra CSV columns (tract name, county, MOE,
+            ...) shown in tooltips via a deduplicated label payload
     """
     try:
         # Read and prepare data
@@ -43,62 +197,29 @@ def generate_choropleth(csv_file, json_file, token_file, output_html):
 
         print(f"Found {len(matching_geoids)} matching GEOIDs")
 
+        # Sort rows and features so identical inputs give identical bytes
+        df = df.sort_values("GEOID", kind="stable", ignore_index=True)
+        geojson_data["features"].sort(
+            key=lambda feature: str(feature.get("properties", {}).get("GEOID", ""))
+        )
+
         # Load Mapbox token
         with open(token_file, "r") as f:
             px.set_mapbox_access_token(f.read().strip())
 
         # Create choropleth
-        fig = px.choropleth_mapbox(
-            df,
-            geojson=geojson_data,
-            locations="GEOID",
-            color="Total_Population",
-            color_continuous_scale="Reds",
-            range_color=(0, df["Total_Population"].quantile(0.99)),
-            featureidkey="properties.GEOID",
-            mapbox_style="light",
-            zoom=3.5,
-            opacity=1.0,
-            center={"lat": 37.0902, "lon": -95.7129},
-            hover_data={"Total_Population": True},
-            labels={"Total_Population": "Total Population"},
-        )
+        fig = build_choropleth_figure(df, geojson_data)
 
-        fig.update_traces(marker_line_width=0.000000001, marker_line_color="#D3D3D3")
-
-        fig.update_layout(
-            margin={"r": 0, "t": 25, "l": 0, "b": 0},
-            title={
-                "text": "Census Tract Population Distribution",
-                "xanchor": "center",
-                "x": 0.5,
-            },
-            coloraxis_colorbar={
-                "title": "Total Population",
-                "title_side": "bottom",
-                "orientation": "h",
-                "x": 0.5,
-                "xanchor": "center",
-                "y": -0.00000001,
-                "yanchor": "top",
-                "len": 0.9,
-            },
-            annotations=[
-                {
-                    "text": "Source: U.S. Census Bureau, American Community Survey",
-                    "xref": "paper",
-                    "yref": "paper",
-                    "x": 0.01,
-                    "y": 0.01,
-                    "showarrow": False,
-                    "font": {"size": 10},
-                    "align": "left",
-                }
-            ],
-        )
-
-        # Save the map
-        fig.write_html(output_html)
+        # Save the map, rebuilding rich tooltips client-side if requested
+        if hover_columns:
+            payload = build_hover_payload(df, hover_columns)
+            fig.write_html(
+                output_html,
+                div_id=CHOROPLETH_DIV_ID,
+                post_script=hover_script(payload, "Total Population"),
+            )
+        else:
+            fig.write_html(output_html, div_id=CHOROPLETH_DIV_ID)
         print(f"Choropleth map saved to: {output_html}")
 
         return fig
@@ -106,3 +227,125 @@ def generate_choropleth(csv_file, json_file, token_file, output_html):
     except Exception as e:
         print(f"Error generating choropleth: {str(e)}")
         raise
+
+
+def _polygon_paths(geometries):
+    """
+    Build one compound Path per polygon part, holes included, plus the row
+    each part came from.
+    """
+    parts, owner = shapely.get_parts(np.asarray(geometries), return_index=True)
+    rings, part_idx = shapely.get_rings(parts, return_index=True)
+    # Exteriors counter-clockwise and holes clockwise, so filling cuts holes
+    exterior = np.r_[True, part_idx[1:] != part_idx[:-1]]
+    flip = shapely.is_ccw(rings) != exterior
+    rings[flip] = shapely.reverse(rings[flip])
+
+    coords, ring_idx = shapely.get_coordinates(rings, return_index=True)
+    codes = np.full(len(coords), Path.LINETO, dtype=Path.code_type)
+    starts = np.r_[0, np.flatnonzero(np.diff(ring_idx)) + 1]
+    codes[starts] = Path.MOVETO
+    codes[np.r_[starts[1:], len(coords)] - 1] = Path.CLOSEPOLY
+
+    vertex_part = part_idx[ring_idx]
+    breaks = np.flatnonzero(np.diff(vertex_part)) + 1
+    paths = [
+        Path(vertices, part_codes)
+        for vertices, part_codes in zip(
+            np.split(coords, breaks), np.split(codes, breaks)
+        )
+    ]
+    return paths, owner[np.unique(vertex_part)]
+
+
+def render_static_map(
+    gdf,
+    values,
+    output_path,
+    width=800,
+    height=500,
+    dpi=100,
+    cmap="Reds",
+    vmax=None,
+    title=None,
+):
+    """
+    Draw tract polygons straight to a PNG/SVG file with no browser or token.
+
+    All polygons are drawn with a single PathCollection of compound paths,
+    so holes are cut out and a tract never paints over an enclave inside
+    it, whatever the row order.
+
+    Args:
+        gdf (gpd.GeoDataFrame): Tract geometries
+        values (array-like): One value per row of gdf (NaN draws as grey)
+        output_path (str): Output file; the extension picks PNG or SVG
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        dpi (int): Resolution used to convert pixels to inches
+        cmap (str): Matplotlib colormap name
+        vmax (float): Top of the color range (defaults to the 99th percentile)
+        title (str): Optional title drawn above the map
+
+    Returns:
+        Figure: The matplotlib figure that was saved
+    """
+    values = np.asarray(values, dtype="float64")
+    paths, owner = _polygon_paths(gdf.geometry.values)
+
+    if vmax is None:
+        finite = values[np.isfinite(values)]
+        vmax = np.quantile(finite, 0.99) if len(finite) else 1.0
+    colors = colormaps[cmap](Normalize(vmin=0, vmax=vmax, clip=True)(values))
+    colors[~np.isfinite(values)] = (0.83, 0.83, 0.83, 1.0)
+
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 0.93 if title else 1])
+    ax.add_collection(
+        PathCollection(paths, facecolors=colors[owner], edgecolors="none")
+    )
+
+    minx, miny, maxx, maxy = gdf.total_bounds
+    ax.set_xlim(minx, maxx)
+    ax.set_ylim(miny, maxy)
+    # Keep lon/lat maps from looking stretched away from the equator
+    ax.set_aspect(1 / np.cos(np.radians((miny + maxy) / 2)))
+    ax.set_axis_off()
+    if title:
+        fig.suptitle(title, fontsize=10)
+
+    # Fixed SVG ID salt and no timestamp keep repeated renders byte-identical
+    with rc_context({"svg.hashsalt": "census-tract-choropleth"}):
+        fig.savefig(output_path, dpi=dpi, metadata={"Date": None})
+    return fig
+
+
+def generate_static_choropleth(
+    csv_file, json_file, output_path, column="Total_Population", **kwargs
+):
+    """
+    Generate an offline raster choropleth from the processed CSV and GeoJSON.
+
+    Args:
+        csv_file: Path to processed CSV with tract data
+        json_file: Path to GeoJSON with tract boundaries
+        output_path: Path to save the PNG or SVG image
+        column: CSV column used to color the tracts
+        **kwargs: Passed through to render_static_map
+
+    Returns:
+        Figure: The matplotlib figure that was saved
+    """
+    df = pd.read_csv(csv_file, dtype={"GEOID": str})
+    if "GEOID" not in df.columns:
+        raise ValueError("CSV file must contain a 'GEOID' column")
+
+    gdf = gpd.read_file(json_file, columns=["GEOID"])
+    values = gdf["GEOID"].astype(str).map(df.set_index("GEOID")[column])
+    if values.notna().sum() == 0:
+        raise ValueError("No matching GEOIDs found between CSV and GeoJSON")
+
+    fig = render_static_map(gdf, values, output_path, **kwargs)
+    print(f"Static choropleth saved to: {output_path}")
+    return fig